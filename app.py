@@ -1,23 +1,43 @@
 import os
+import gzip
+import mimetypes
+import shutil
+import tempfile
+import time
 import pandas as pd
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, abort, g, render_template, request, jsonify, send_from_directory
 from werkzeug.utils import secure_filename
-from excel_processor.utils import read_file_to_dataframe
+from werkzeug.security import safe_join
+from excel_processor.utils import read_file_header
+from excel_processor.jobs import (
+    AdmissionController,
+    AdmissionRejected,
+    WorkerLimitExceeded,
+    cleanup_expired_work_dirs,
+    create_work_dir,
+    estimate_memory_cost,
+    estimate_text_memory_cost,
+    run_in_worker
+)
 
 # Import your excel processing functions here
 from excel_processor import (
     convert_column_to_list, 
     get_column_data, 
     convert_columns_to_json, 
-    get_columns_as_json_records,
+    get_json_records_page,
+    build_records_cache,
+    has_records_cache,
     add_json_column_to_file,
     convert_json_to_table,
     get_json_preview,
-    process_clipboard_data_to_list,
-    process_clipboard_json_to_table,
-    save_clipboard_data_to_file,
-    extract_lists_from_text,
-    format_extracted_lists
+    build_json_record_index,
+    has_json_record_index,
+    run_clipboard_action,
+    parse_filters,
+    parse_row_range,
+    normalize_compression,
+    COMPRESSION_SUFFIXES
 )
 
 app = Flask(__name__)
@@ -31,15 +51,156 @@ app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['GENERATED_FOLDER'] = GENERATED_FOLDER
 # Increase max content length to 50MB for large SQL files
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB
+# Number of records sent per window when results are displayed on the page
+app.config['DISPLAY_PAGE_SIZE'] = 200
+MAX_DISPLAY_PAGE_SIZE = 5000
+# Pre-compressed variants tried by /download, in order of preference
+DOWNLOAD_ENCODINGS = ['zstd', 'gzip']
+# Content types of compressed files that are downloaded under their own name
+COMPRESSED_MIMETYPES = {'gzip': 'application/gzip', 'zstd': 'application/zstd'}
+# Total estimated memory that running conversions may use, shared by all workers on the host
+app.config['MEMORY_BUDGET_MB'] = int(os.environ.get('GTOOLS_MEMORY_BUDGET_MB', 2048))
+# Time a request may take in total. It is shared with gunicorn's --timeout (see
+# Dockerfile.production), and the queue wait and worker run time are both carved out
+# of it, so a conversion always ends before gunicorn kills the worker.
+app.config['REQUEST_TIMEOUT_SECONDS'] = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+# Time kept back for saving the upload and sending the response
+REQUEST_TIMEOUT_MARGIN_SECONDS = 10
+# Longest a request waits for memory budget, as a share of the request timeout
+app.config['ADMISSION_QUEUE_TIMEOUT'] = app.config['REQUEST_TIMEOUT_SECONDS'] // 4
+# Resident memory limit of the subprocess each conversion runs in
+app.config['WORKER_MAX_RSS_MB'] = int(os.environ.get('GTOOLS_WORKER_MAX_RSS_MB', 1536))
+# Per-request upload and output directories older than this are removed
+app.config['WORK_DIR_TTL_SECONDS'] = int(os.environ.get('GTOOLS_WORK_DIR_TTL_SECONDS', 6 * 3600))
+# Form fields holding the output method and file format of each clipboard action, and the default format
+CLIPBOARD_OUTPUT_FIELDS = {
+    'to_list': ('list_output_method', 'list_file_format', 'md'),
+    'from_json': ('json_output_method', 'json_file_format', 'csv'),
+    'extract_lists': ('extract_output_method', 'extract_file_format', 'md'),
+}
+ADMISSION_STATE_FOLDER = os.path.join(tempfile.gettempdir(), 'gtools-admission')
 
 # Ensure the upload and generated directories exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(GENERATED_FOLDER, exist_ok=True)
 
+admission = AdmissionController(ADMISSION_STATE_FOLDER, app.config['MEMORY_BUDGET_MB'] * 1024 * 1024,
+                                queue_timeout=app.config['ADMISSION_QUEUE_TIMEOUT'])
+
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def get_page_window():
+    """Reads the offset/limit pair of a paged request, capping the window size."""
+    offset = request.values.get('offset', 0, type=int)
+    limit = request.values.get('limit', app.config['DISPLAY_PAGE_SIZE'], type=int)
+    return max(offset, 0), min(max(limit, 1), MAX_DISPLAY_PAGE_SIZE)
+
+def get_row_filters():
+    """Reads the optional row filters and row range of a conversion request."""
+    filters = parse_filters(request.values.get('filters'))
+    row_range = parse_row_range(request.values.get('row_start'), request.values.get('row_end'))
+    return filters, row_range
+
+def save_upload(file, with_output_folder=True):
+    """
+    Saves an uploaded file into a new work directory of its own, so concurrent
+    uploads of files with the same name never overwrite each other.
+
+    :param with_output_folder: Whether to also create the request's generated files folder.
+    :return: A tuple of (file_id, file path, output folder for this request or None).
+    """
+    for folder in (app.config['UPLOAD_FOLDER'], app.config['GENERATED_FOLDER']):
+        cleanup_expired_work_dirs(folder, app.config['WORK_DIR_TTL_SECONDS'])
+
+    job_id, work_dir = create_work_dir(app.config['UPLOAD_FOLDER'])
+    # The work directory is unique, so only path components need to be stripped.
+    # secure_filename is not used as it would drop non-ASCII names entirely.
+    filename = os.path.basename(file.filename.replace('\\', '/')).strip()
+    if filename.startswith('.'):
+        filename = f"upload{filename}"
+    filepath = os.path.join(work_dir, filename)
+    file.save(filepath)
+    output_folder = create_output_folder(job_id) if with_output_folder else None
+    return f"{job_id}/{filename}", filepath, output_folder
+
+def create_output_folder(job_id=None):
+    """Creates the directory generated files of one request are written to."""
+    if job_id is None:
+        job_id, output_folder = create_work_dir(app.config['GENERATED_FOLDER'])
+        return output_folder
+    output_folder = os.path.join(app.config['GENERATED_FOLDER'], job_id)
+    os.makedirs(output_folder, exist_ok=True)
+    return output_folder
+
+def download_url_for(output_path):
+    """
+    Builds the /download URL of a file inside the generated files folder.
+    Compressed outputs are linked by their uncompressed name, so /download can
+    pick the encoding the client accepts.
+    """
+    relative_path = os.path.relpath(output_path, app.config['GENERATED_FOLDER'])
+    for suffix in COMPRESSION_SUFFIXES.values():
+        if relative_path.endswith(suffix):
+            relative_path = relative_path[:-len(suffix)]
+            break
+    return f"/download/{relative_path.replace(os.sep, '/')}"
+
+def resolve_uploaded_file(file_id):
+    """Maps a file id returned by an earlier upload back to its path, or None if it is gone."""
+    job_id, _, filename = (file_id or '').partition('/')
+    if job_id != secure_filename(job_id) or not filename:
+        return None
+    filepath = safe_join(app.config['UPLOAD_FOLDER'], job_id, filename)
+    if filepath is None or not os.path.isfile(filepath):
+        return None
+    return filepath
+
+@app.before_request
+def start_request_deadline():
+    g.request_deadline = (time.monotonic() + app.config['REQUEST_TIMEOUT_SECONDS']
+                          - REQUEST_TIMEOUT_MARGIN_SECONDS)
+
+def run_conversion(filepath, func, *args, **kwargs):
+    """Runs a conversion of an uploaded file with run_limited_job, costed from the file."""
+    return run_limited_job(estimate_memory_cost(filepath), func, *args, **kwargs)
+
+def run_limited_job(cost, func, *args, **kwargs):
+    """
+    Runs func in a worker subprocess with CPU time and memory limits, once its
+    estimated memory cost in bytes fits in the shared budget.
+    The queue wait and the worker's time limits use up what is left of the request deadline.
+    """
+    queue_timeout = min(app.config['ADMISSION_QUEUE_TIMEOUT'], g.request_deadline - time.monotonic() - 1)
+    if queue_timeout < 0:
+        raise AdmissionRejected("Server is busy processing other files. Please try again shortly.")
+
+    with admission.admit(cost, timeout=queue_timeout):
+        remaining = g.request_deadline - time.monotonic()
+        return run_in_worker(func, args, kwargs,
+                             cpu_seconds=max(int(remaining), 1),
+                             max_rss_bytes=app.config['WORKER_MAX_RSS_MB'] * 1024 * 1024,
+                             timeout=max(remaining, 1))
+
+def load_records_page(filepath, column_names, offset, limit, filters, row_range):
+    """
+    Returns one window of the JSON records of an uploaded file. The file is parsed
+    once, in a worker subprocess, into an on-disk cache, and windows are then read
+    from that cache without loading the rest of the records.
+    """
+    if not has_records_cache(filepath, column_names, filters, row_range):
+        run_conversion(filepath, build_records_cache, filepath, column_names, filters, row_range)
+    return get_json_records_page(filepath, column_names, offset, limit, filters, row_range)
+
+def job_error_response(error):
+    """Maps admission and worker limit errors to JSON responses."""
+    if isinstance(error, AdmissionRejected):
+        response = jsonify({'error': str(error)})
+        response.headers['Retry-After'] = str(app.config['ADMISSION_QUEUE_TIMEOUT'])
+        return response, 503
+    return jsonify({'error': str(error)}), 500
+
 # Global error handler to ensure JSON responses
 @app.errorhandler(413)
 def request_entity_too_large(error):
@@ -88,25 +249,39 @@ def handle_list_conversion():
     if not column_name:
         return jsonify({'error': 'A column must be selected'}), 400
 
+    try:
+        filters, row_range = get_row_filters()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     if file and allowed_file(file.filename):
-        filename = file.filename
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        _, filepath, output_folder = save_upload(file)
 
         if output_method == 'file':
-            output_path = convert_column_to_list(filepath, column_name, app.config['GENERATED_FOLDER'])
+            try:
+                output_path = run_conversion(filepath, convert_column_to_list, filepath, column_name, output_folder,
+                                             filters=filters, row_range=row_range)
+            except (AdmissionRejected, WorkerLimitExceeded) as e:
+                return job_error_response(e)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
             if output_path:
-                return jsonify({'download_url': f'/download/{os.path.basename(output_path)}'})
+                return jsonify({'download_url': download_url_for(output_path)})
             else:
                 return jsonify({'error': 'Failed to convert file.'}), 500
         
         elif output_method == 'display':
             try:
-                column_data = get_column_data(filepath, column_name)
+                column_data = run_conversion(filepath, get_column_data, filepath, column_name,
+                                             filters=filters, row_range=row_range)
                 # Convert data to a proper JSON array string for display
                 data_list = [str(item) if item is not None and not pd.isna(item) else '' for item in column_data]
                 json_string = '[' + ', '.join(data_list) + ']'
                 return jsonify({'data': json_string, 'is_json_string': True})
+            except (AdmissionRejected, WorkerLimitExceeded) as e:
+                return job_error_response(e)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
             except Exception as e:
                 return jsonify({'error': str(e)}), 500
         
@@ -123,19 +298,19 @@ def get_headers():
     if file.filename == '' or not allowed_file(file.filename):
         return jsonify({'error': 'Invalid or no file selected'}), 400
 
+    # Save to a temporary location to read it. The conversion uploads the file
+    # again, so this copy is removed as soon as the header has been read.
+    _, filepath, _ = save_upload(file, with_output_folder=False)
     try:
-        # Save to a temporary location to read it
-        filename = file.filename
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-
-        df = read_file_to_dataframe(filepath)
-        headers = df.columns.tolist()
+        # Only the header row is parsed, the data is read when converting
+        headers = read_file_header(filepath)
         
         return jsonify({'headers': headers})
     except Exception as e:
         print(f"Error getting headers: {e}")
         return jsonify({'error': 'Could not process file. Please ensure it is a valid Excel or CSV file.'}), 500
+    finally:
+        shutil.rmtree(os.path.dirname(filepath), ignore_errors=True)
 
 
 @app.route('/convert/json', methods=['POST'])
@@ -152,32 +327,113 @@ def handle_json_conversion():
     if not column_names:
         return jsonify({'error': 'At least one column must be selected'}), 400
 
+    output_format = request.form.get('output_format', 'json')
+
+    try:
+        filters, row_range = get_row_filters()
+        compression = normalize_compression(request.form.get('compression'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     if file and allowed_file(file.filename):
-        filename = file.filename
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        file_id, filepath, output_folder = save_upload(file)
 
         try:
             if output_method == 'file':
-                output_path = convert_columns_to_json(filepath, column_names, app.config['GENERATED_FOLDER'])
+                output_path = run_conversion(filepath, convert_columns_to_json, filepath, column_names, output_folder,
+                                             filters=filters, row_range=row_range,
+                                             output_format=output_format, compression=compression)
                 if output_path:
-                    return jsonify({'download_url': f'/download/{os.path.basename(output_path)}'})
+                    return jsonify({'download_url': download_url_for(output_path)})
             elif output_method == 'display':
-                json_records = get_columns_as_json_records(filepath, column_names)
-                return jsonify({'data': json_records})
+                # Only the first window is returned, the page fetches the rest from /api/records
+                offset, limit = get_page_window()
+                page = load_records_page(filepath, column_names, offset, limit, filters, row_range)
+                return jsonify({
+                    'data': page['records'],
+                    'file_id': file_id,
+                    'offset': page['offset'],
+                    'total_rows': page['total_rows'],
+                    'next_offset': page['next_offset']
+                })
             elif output_method == 'add_to_table':
-                output_path = add_json_column_to_file(filepath, column_names, app.config['GENERATED_FOLDER'])
+                output_path = run_conversion(filepath, add_json_column_to_file, filepath, column_names, output_folder,
+                                             filters=filters, row_range=row_range)
                 if output_path:
-                    return jsonify({'download_url': f'/download/{os.path.basename(output_path)}'})
+                    return jsonify({'download_url': download_url_for(output_path)})
             
             # If any path-based method failed, output_path would be None
             return jsonify({'error': 'Failed to process file.'}), 500
 
+        except (AdmissionRejected, WorkerLimitExceeded) as e:
+            return job_error_response(e)
+        except ValueError as e:
+            # Raised for invalid filters and missing columns
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
             
     return jsonify({'error': 'File type not allowed'}), 400
 
+@app.route('/api/records', methods=['GET', 'POST'])
+def get_records_page():
+    filepath = resolve_uploaded_file(request.values.get('file_id'))
+    if not filepath or not allowed_file(filepath):
+        return jsonify({'error': 'File not found. Please upload it again.'}), 404
+
+    column_names = request.values.getlist('column_names')
+    if not column_names:
+        return jsonify({'error': 'At least one column must be selected'}), 400
+
+    offset, limit = get_page_window()
+    try:
+        filters, row_range = get_row_filters()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        page = load_records_page(filepath, column_names, offset, limit, filters, row_range)
+        return jsonify({
+            'data': page['records'],
+            'offset': page['offset'],
+            'total_rows': page['total_rows'],
+            'next_offset': page['next_offset']
+        })
+    except (AdmissionRejected, WorkerLimitExceeded) as e:
+        return job_error_response(e)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/json-preview', methods=['POST'])
+def json_preview():
+    if 'file' in request.files:
+        file = request.files['file']
+        if file.filename == '' or not file.filename.lower().endswith('.json'):
+            return jsonify({'error': 'File must be a JSON file'}), 400
+        file_id, filepath, _ = save_upload(file, with_output_folder=False)
+    else:
+        file_id = request.values.get('file_id')
+        filepath = resolve_uploaded_file(file_id)
+        if not filepath or not filepath.lower().endswith('.json'):
+            return jsonify({'error': 'File not found. Please upload it again.'}), 404
+
+    offset, limit = get_page_window()
+    try:
+        # The record offsets are indexed once in a worker, windows are then read by seeking
+        if not has_json_record_index(filepath):
+            run_conversion(filepath, build_json_record_index, filepath)
+    except (AdmissionRejected, WorkerLimitExceeded) as e:
+        return job_error_response(e)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    preview = get_json_preview(filepath, limit, offset)
+    if 'error' in preview:
+        return jsonify(preview), 400
+    preview['file_id'] = file_id
+    return jsonify(preview)
+
 @app.route('/convert/from-json', methods=['POST'])
 def handle_from_json_conversion():
     if 'file' not in request.files:
@@ -187,18 +443,23 @@ def handle_from_json_conversion():
         return jsonify({'error': 'No selected file'}), 400
     
     output_format = request.form.get('output_format', 'csv')
+
+    try:
+        compression = normalize_compression(request.form.get('compression'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     if file and file.filename.lower().endswith('.json'):
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        _, filepath, output_folder = save_upload(file)
 
         try:
-            output_path = convert_json_to_table(filepath, output_format, app.config['GENERATED_FOLDER'])
+            output_path = run_conversion(filepath, convert_json_to_table, filepath, output_format, output_folder, compression)
             if output_path:
-                return jsonify({'download_url': f'/download/{os.path.basename(output_path)}'})
+                return jsonify({'download_url': download_url_for(output_path)})
             else:
                 return jsonify({'error': 'Failed to convert JSON file.'}), 500
+        except (AdmissionRejected, WorkerLimitExceeded) as e:
+            return job_error_response(e)
         except Exception as e:
             return jsonify({'error': str(e)}), 500
             
@@ -214,63 +475,90 @@ def handle_clipboard_conversion():
     
     if not action:
         return jsonify({'error': 'No action selected'}), 400
-    
-    try:
-        if action == 'to_list':
-            # Convert column to list
-            output_method = request.form.get('list_output_method', 'display')
-            
-            if output_method == 'display':
-                result = process_clipboard_data_to_list(data_text, 'display')
-                return jsonify({'data': result, 'is_json_string': True})
-            elif output_method == 'file':
-                file_format = request.form.get('list_file_format', 'md')
-                data_lines = process_clipboard_data_to_list(data_text, 'file')
-                output_path = save_clipboard_data_to_file(data_lines, 'clipboard_data', file_format, app.config['GENERATED_FOLDER'])
-                return jsonify({'download_url': f'/download/{os.path.basename(output_path)}'})
-                
-        elif action == 'from_json':
-            # Convert JSON to table
-            output_method = request.form.get('json_output_method', 'display')
-            
-            if output_method == 'display':
-                result = process_clipboard_json_to_table(data_text, 'display')
-                return jsonify({'data': result})
-            elif output_method == 'file':
-                file_format = request.form.get('json_file_format', 'csv')
-                df = process_clipboard_json_to_table(data_text, file_format)
-                output_path = save_clipboard_data_to_file(df, 'clipboard_data', file_format, app.config['GENERATED_FOLDER'])
-                return jsonify({'download_url': f'/download/{os.path.basename(output_path)}'})
-        
-        elif action == 'extract_lists':
-            # Extract lists from text
-            output_method = request.form.get('extract_output_method', 'display')
-            
-            if output_method == 'display':
-                result = extract_lists_from_text(data_text)
-                formatted_result = format_extracted_lists(result)
-                return jsonify({'data': formatted_result})
-            elif output_method == 'file':
-                file_format = request.form.get('extract_file_format', 'md')
-                result = extract_lists_from_text(data_text)
-                formatted_result = format_extracted_lists(result)
-                # Save as text file
-                output_filename = f"extracted_lists.md"
-                output_path = os.path.join(app.config['GENERATED_FOLDER'], output_filename)
-                os.makedirs(app.config['GENERATED_FOLDER'], exist_ok=True)
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(formatted_result)
-                return jsonify({'download_url': f'/download/{os.path.basename(output_path)}'})
-        
+
+    if action not in CLIPBOARD_OUTPUT_FIELDS:
         return jsonify({'error': 'Invalid action'}), 400
-        
+    method_field, format_field, default_format = CLIPBOARD_OUTPUT_FIELDS[action]
+    output_method = request.form.get(method_field, 'display')
+    if output_method not in ('display', 'file'):
+        return jsonify({'error': 'Invalid action'}), 400
+    file_format = request.form.get(format_field, default_format)
+    output_folder = create_output_folder() if output_method == 'file' else None
+
+    try:
+        # Pasted data can be as large as an uploaded file, so it gets the same limits
+        result = run_limited_job(estimate_text_memory_cost(data_text), run_clipboard_action,
+                                 data_text, action, output_method, file_format, output_folder)
+    except (AdmissionRejected, WorkerLimitExceeded) as e:
+        return job_error_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+    if 'output_path' in result:
+        return jsonify({'download_url': download_url_for(result['output_path'])})
+    return jsonify(result)
 
-@app.route('/download/<filename>')
+
+def _decompress_file(compressed_path, output_path, encoding):
+    """Writes the decompressed content of a gzip or zstd file next to it."""
+    if encoding == 'gzip':
+        source = gzip.open(compressed_path, 'rb')
+    else:
+        import zstandard
+        source = zstandard.ZstdDecompressor().stream_reader(open(compressed_path, 'rb'), closefd=True)
+    # Written under a temporary name, so a concurrent download never sends a partial file
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(output_path), suffix='.tmp')
+    try:
+        with source, os.fdopen(fd, 'wb') as f:
+            shutil.copyfileobj(source, f)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+@app.route('/download/<path:filename>')
 def download_file(filename):
-    return send_from_directory(app.config['GENERATED_FOLDER'], filename, as_attachment=True)
+    """
+    Serves a generated file. Range requests are handled by send_from_directory,
+    so interrupted downloads can be resumed. When a gzip/zstd variant of the file
+    exists and the client accepts that encoding, it is sent with Content-Encoding
+    instead of the uncompressed file. A compressed file requested by its own
+    name is sent as-is.
+    """
+    folder = app.config['GENERATED_FOLDER']
+    filepath = safe_join(folder, filename)
+    if filepath is None:
+        abort(404)
+
+    for encoding, suffix in COMPRESSION_SUFFIXES.items():
+        if filename.endswith(suffix):
+            return send_from_directory(folder, filename, as_attachment=True,
+                                       mimetype=COMPRESSED_MIMETYPES[encoding])
+
+    download_name = os.path.basename(filepath)
+    mimetype = mimetypes.guess_type(download_name)[0] or 'application/octet-stream'
+
+    for encoding in DOWNLOAD_ENCODINGS:
+        compressed_name = filename + COMPRESSION_SUFFIXES[encoding]
+        if request.accept_encodings[encoding] and os.path.isfile(filepath + COMPRESSION_SUFFIXES[encoding]):
+            response = send_from_directory(folder, compressed_name, as_attachment=True,
+                                           download_name=download_name, mimetype=mimetype)
+            response.headers['Content-Encoding'] = encoding
+            response.vary.add('Accept-Encoding')
+            return response
+
+    if not os.path.isfile(filepath):
+        # Only a compressed variant the client can't decode exists. It is decompressed
+        # once on disk, so the plain file can be served with Range support like any other.
+        for encoding in DOWNLOAD_ENCODINGS:
+            compressed_path = filepath + COMPRESSION_SUFFIXES[encoding]
+            if os.path.isfile(compressed_path):
+                _decompress_file(compressed_path, filepath, encoding)
+                break
+
+    response = send_from_directory(folder, filename, as_attachment=True, mimetype=mimetype)
+    response.vary.add('Accept-Encoding')
+    return response
 
 if __name__ == '__main__':
     app.run(debug=True)
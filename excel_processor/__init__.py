@@ -1,4 +1,6 @@
 from .to_list import convert_column_to_list, get_column_data
-from .to_json import convert_columns_to_json, get_columns_as_json_records, add_json_column_to_file
-from .from_json import convert_json_to_table, get_json_preview
-from .clipboard import process_clipboard_data_to_list, process_clipboard_json_to_table, save_clipboard_data_to_file, extract_lists_from_text, format_extracted_lists
+from .to_json import convert_columns_to_json, get_columns_as_json_records, get_json_records_page, build_records_cache, has_records_cache, add_json_column_to_file
+from .from_json import convert_json_to_table, get_json_preview, build_json_record_index, has_json_record_index
+from .clipboard import process_clipboard_data_to_list, process_clipboard_json_to_table, save_clipboard_data_to_file, extract_lists_from_text, format_extracted_lists, run_clipboard_action
+from .filters import parse_filters, parse_row_range, apply_filters
+from .writers import normalize_compression, COMPRESSION_SUFFIXES
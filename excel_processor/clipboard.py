@@ -234,3 +234,38 @@ def save_clipboard_data_to_file(data, filename, output_format, output_folder):
         
     except Exception as e:
         raise ValueError(f"Error saving file: {str(e)}")
+
+def run_clipboard_action(data_text, action, output_method, file_format, output_folder):
+    """
+    Runs one clipboard action from start to finish, so it can be executed in a
+    worker subprocess as a single job.
+
+    :return: A dictionary with 'data' (and 'is_json_string') for display output,
+             or 'output_path' for file output.
+    """
+    if action == 'to_list':
+        if output_method == 'display':
+            return {'data': process_clipboard_data_to_list(data_text, 'display'), 'is_json_string': True}
+        if output_method == 'file':
+            data_lines = process_clipboard_data_to_list(data_text, 'file')
+            return {'output_path': save_clipboard_data_to_file(data_lines, 'clipboard_data', file_format, output_folder)}
+
+    elif action == 'from_json':
+        if output_method == 'display':
+            return {'data': process_clipboard_json_to_table(data_text, 'display')}
+        if output_method == 'file':
+            df = process_clipboard_json_to_table(data_text, file_format)
+            return {'output_path': save_clipboard_data_to_file(df, 'clipboard_data', file_format, output_folder)}
+
+    elif action == 'extract_lists':
+        formatted_result = format_extracted_lists(extract_lists_from_text(data_text))
+        if output_method == 'display':
+            return {'data': formatted_result}
+        if output_method == 'file':
+            # Save as text file
+            output_path = os.path.join(output_folder, "extracted_lists.md")
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(formatted_result)
+            return {'output_path': output_path}
+
+    return None
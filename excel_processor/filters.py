@@ -0,0 +1,168 @@
+import pandas as pd
+import json
+import math
+
+# Operators accepted in a filter and the number of values each one takes
+FILTER_OPERATORS = {
+    'eq': 'scalar',
+    'ne': 'scalar',
+    'gt': 'scalar',
+    'ge': 'scalar',
+    'lt': 'scalar',
+    'le': 'scalar',
+    'between': 'pair',
+    'in': 'list',
+    'notnull': 'none',
+}
+
+def parse_filters(filters):
+    """
+    Validates a filter specification and returns it as a list of dictionaries.
+    Accepts either a JSON string or an already decoded list, e.g.
+    [{"column": "Age", "op": "between", "value": [18, 30]}, {"column": "City", "op": "in", "value": ["Paris", "Rome"]}]
+
+    :param filters: JSON string, list of filter dictionaries, or None/empty for no filtering.
+    :return: A list of filter dictionaries with 'column', 'op' and 'value' keys.
+    """
+    if not filters:
+        return []
+    if isinstance(filters, str):
+        try:
+            filters = json.loads(filters)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid filter format: {str(e)}")
+    if isinstance(filters, dict):
+        filters = [filters]
+    if not isinstance(filters, list):
+        raise ValueError("Filters must be a list of objects")
+
+    parsed = []
+    for item in filters:
+        if not isinstance(item, dict) or not item.get('column'):
+            raise ValueError("Each filter must be an object with a 'column'")
+        op = item.get('op', 'eq')
+        if op not in FILTER_OPERATORS:
+            raise ValueError(f"Unsupported filter operator: {op}")
+
+        value = item.get('value')
+        arity = FILTER_OPERATORS[op]
+        if arity == 'pair' and not (isinstance(value, list) and len(value) == 2):
+            raise ValueError(f"Filter '{op}' on column '{item['column']}' needs a [low, high] value")
+        if arity == 'list' and not isinstance(value, list):
+            raise ValueError(f"Filter '{op}' on column '{item['column']}' needs a list value")
+        if arity == 'scalar' and (value is None or isinstance(value, (list, dict))):
+            raise ValueError(f"Filter '{op}' on column '{item['column']}' needs a single value")
+
+        parsed.append({'column': item['column'], 'op': op, 'value': value})
+    return parsed
+
+def parse_row_range(row_start=None, row_end=None):
+    """
+    Builds a (start, stop) data row slice from optional bounds, or None when no slice is requested.
+    Rows are counted from 0, excluding the header, and the stop row is not included.
+    """
+    if row_start in (None, '') and row_end in (None, ''):
+        return None
+    try:
+        start = int(row_start) if row_start not in (None, '') else 0
+        stop = int(row_end) if row_end not in (None, '') else None
+    except (TypeError, ValueError):
+        raise ValueError("Row range bounds must be integers")
+    if start < 0 or (stop is not None and stop < start):
+        raise ValueError("Invalid row range")
+    return (start, stop)
+
+def filter_columns(filters):
+    """Returns the column names referenced by a list of filters, in order."""
+    return list(dict.fromkeys(f['column'] for f in filters or []))
+
+def _parse_number(value):
+    """Returns a filter value as a float if it is a number or numeric text, otherwise None."""
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    return number if math.isfinite(number) else None
+
+def _cell_text(value):
+    # Whole floats are written without '.0', so 1 and 1.0 compare the same as text
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def _coerce_value(series, value, row_filter):
+    """
+    Converts a filter value so it compares against the series the way a user expects.
+    Numbers and numeric text compare numerically (cells that aren't numbers never match),
+    datetime columns compare as dates and everything else compares as text.
+    The choice depends on the filter value rather than the dtype pandas inferred, so
+    every CSV chunk of a file is filtered the same way.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        try:
+            return series, pd.to_datetime(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Filter '{row_filter['op']}' on column '{row_filter['column']}' needs a date value")
+    number = _parse_number(value)
+    if number is not None:
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            return series, number
+        return pd.to_numeric(series, errors='coerce'), number
+    return series.map(_cell_text), str(value)
+
+def _filter_mask(df, row_filter):
+    """Builds the boolean mask of rows matching a single filter."""
+    series = df[row_filter['column']]
+    op = row_filter['op']
+    value = row_filter['value']
+    present = series.notna()
+
+    if op == 'notnull':
+        return present
+    if op == 'in':
+        mask = pd.Series(False, index=df.index)
+        for item in value:
+            values, item = _coerce_value(series, item, row_filter)
+            mask |= values == item
+        return mask & present
+    if op == 'between':
+        values, low = _coerce_value(series, value[0], row_filter)
+        values, high = _coerce_value(series, value[1], row_filter)
+        return (values >= low) & (values <= high) & present
+
+    values, value = _coerce_value(series, value, row_filter)
+    if op == 'eq':
+        return (values == value) & present
+    if op == 'ne':
+        return (values != value) | ~present
+    if op == 'gt':
+        return (values > value) & present
+    if op == 'ge':
+        return (values >= value) & present
+    if op == 'lt':
+        return (values < value) & present
+    return (values <= value) & present
+
+def apply_filters(df, filters):
+    """
+    Returns the rows of a DataFrame that match every filter.
+
+    :param df: The input DataFrame.
+    :param filters: A list of filters as returned by parse_filters.
+    :return: The filtered DataFrame (the input itself when there are no filters).
+    """
+    if not filters:
+        return df
+    for col in filter_columns(filters):
+        if col not in df.columns:
+            raise ValueError(f"Column '{col}' not found in the file.")
+
+    mask = pd.Series(True, index=df.index)
+    for row_filter in filters:
+        try:
+            mask &= _filter_mask(df, row_filter)
+        except TypeError:
+            raise ValueError(f"Filter '{row_filter['op']}' cannot be applied to column '{row_filter['column']}'")
+    return df[mask]
@@ -1,14 +1,27 @@
 import pandas as pd
 import os
 import json
-from .utils import read_file_to_dataframe
+import re
+import uuid
+import struct
+from .utils import RECORDS_CACHE_FOLDER, read_file_to_dataframe, normalize_window
+from .writers import build_output_path, normalize_compression, write_dataframe
 
-def convert_json_to_table(json_file_path, output_format, output_folder):
+# Bytes read at a time when indexing the records of a JSON file
+RECORD_INDEX_READ_SIZE = 1024 * 1024
+# Record index entries: the JSON file's size and mtime in the header, then (start, end) byte offsets
+_RECORD_INDEX_ENTRY = struct.Struct('<qq')
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+def convert_json_to_table(json_file_path, output_format, output_folder, compression=None):
     """
-    Reads a JSON file and converts it to CSV or Excel format.
+    Reads a JSON file and converts it to CSV, Excel, NDJSON or Parquet format.
     Expects JSON file to contain a list of objects (records).
+    CSV and NDJSON outputs can be gzip/zstd compressed while they are written.
     """
     try:
+        compression = normalize_compression(compression)
+
         # Read JSON file
         with open(json_file_path, 'r', encoding='utf-8') as f:
             json_data = json.load(f)
@@ -27,20 +40,10 @@ def convert_json_to_table(json_file_path, output_format, output_folder):
         base_filename = os.path.basename(json_file_path)
         name, _ = os.path.splitext(base_filename)
         
-        if output_format == 'csv':
-            output_filename = f"{name}_converted.csv"
-            output_path = os.path.join(output_folder, output_filename)
-            df.to_csv(output_path, index=False, encoding='utf-8')
-        elif output_format == 'xlsx':
-            output_filename = f"{name}_converted.xlsx"
-            output_path = os.path.join(output_folder, output_filename)
-            df.to_excel(output_path, index=False)
-        elif output_format == 'xls':
-            output_filename = f"{name}_converted.xls"
-            output_path = os.path.join(output_folder, output_filename)
-            df.to_excel(output_path, index=False)
-        else:
+        if output_format not in ['csv', 'xlsx', 'xls', 'ndjson', 'parquet']:
             raise ValueError(f"Unsupported output format: {output_format}")
+        output_path = build_output_path(output_folder, f"{name}_converted", output_format, compression)
+        write_dataframe(df, output_path, output_format, compression)
         
         return output_path
         
@@ -49,36 +52,157 @@ def convert_json_to_table(json_file_path, output_format, output_folder):
     except Exception as e:
         raise ValueError(f"Error converting JSON to table: {str(e)}")
 
-def get_json_preview(json_file_path, max_rows=5):
+def _iter_json_record_offsets(f):
+    """
+    Yields the (start, end) byte offsets of the top-level records of a JSON array
+    read from a binary file, reading it in blocks. The data is decoded as latin-1,
+    which maps every byte to one character, so text positions are byte offsets.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    buffer_start = 0  # File offset of buffer[0]
+    pos = 0
+
+    def read_more():
+        nonlocal buffer, buffer_start, pos
+        # The read size grows with the buffer, so a large record is only re-decoded a few times
+        chunk = f.read(max(RECORD_INDEX_READ_SIZE, len(buffer) - pos))
+        if not chunk:
+            return False
+        buffer = buffer[pos:] + chunk.decode('latin-1')
+        buffer_start += pos
+        pos = 0
+        return True
+
+    def next_char():
+        """Skips whitespace and returns the next character, or '' at the end of the file."""
+        nonlocal pos
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos < len(buffer):
+                return buffer[pos]
+            if not read_more():
+                return ''
+
+    read_more()
+    if buffer.startswith('\xef\xbb\xbf'):  # UTF-8 byte order mark
+        pos = 3
+    if next_char() != '[':
+        raise ValueError("JSON file must contain a list of objects")
+    pos += 1
+
+    char = next_char()
+    if char == ']':
+        return
+    while True:
+        if char != '{':
+            raise ValueError("JSON file must contain a list of objects" if char
+                             else "Invalid JSON format: unexpected end of file")
+        while True:
+            try:
+                _, end = decoder.raw_decode(buffer, pos)
+                break
+            except json.JSONDecodeError as e:
+                # The record may continue past the end of the buffer
+                if not read_more():
+                    raise ValueError(f"Invalid JSON format: {e.msg}")
+        yield buffer_start + pos, buffer_start + end
+        pos = end
+
+        char = next_char()
+        if char == ']':
+            return
+        if char != ',':
+            raise ValueError("JSON file must contain a list of objects" if char
+                             else "Invalid JSON format: unexpected end of file")
+        pos += 1
+        char = next_char()
+
+def _record_index_path(json_file_path):
+    cache_folder = os.path.join(os.path.dirname(json_file_path), RECORDS_CACHE_FOLDER)
+    return os.path.join(cache_folder, f"{os.path.basename(json_file_path)}.idx")
+
+def has_json_record_index(json_file_path):
+    """Checks whether build_json_record_index has already indexed the current version of a file."""
+    stat = os.stat(json_file_path)
+    try:
+        with open(_record_index_path(json_file_path), 'rb') as f:
+            header = f.read(_RECORD_INDEX_ENTRY.size)
+    except FileNotFoundError:
+        return False
+    return (len(header) == _RECORD_INDEX_ENTRY.size
+            and _RECORD_INDEX_ENTRY.unpack(header) == (stat.st_size, stat.st_mtime_ns))
+
+def build_json_record_index(json_file_path):
+    """
+    Scans a JSON file containing a list of objects and stores the byte offsets
+    (start, end) of every top-level record in an index file next to it. The file
+    is read in blocks, so memory use doesn't grow with its size, and the index is
+    reused until the file changes, so later windows only seek and parse their own records.
+
+    :return: The number of records.
+    """
+    index_path = _record_index_path(json_file_path)
+    if has_json_record_index(json_file_path):
+        return os.path.getsize(index_path) // _RECORD_INDEX_ENTRY.size - 1
+
+    stat = os.stat(json_file_path)
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    # Written under a temporary name and renamed, so a concurrent reader never sees a partial index
+    temp_path = f"{index_path}.{uuid.uuid4().hex}.tmp"
+    total_rows = 0
+    try:
+        with open(json_file_path, 'rb') as f, open(temp_path, 'wb') as index_file:
+            index_file.write(_RECORD_INDEX_ENTRY.pack(stat.st_size, stat.st_mtime_ns))
+            for offsets in _iter_json_record_offsets(f):
+                index_file.write(_RECORD_INDEX_ENTRY.pack(*offsets))
+                total_rows += 1
+        os.replace(temp_path, index_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return total_rows
+
+def get_json_preview(json_file_path, max_rows=5, offset=0):
     """
     Reads a JSON file and returns a preview of the data structure.
+    Only the records in the requested window (offset, max_rows) are decoded.
     """
     try:
-        with open(json_file_path, 'r', encoding='utf-8') as f:
-            json_data = json.load(f)
-        
-        if not isinstance(json_data, list):
-            return {"error": "JSON file must contain a list of objects"}
-        
-        if len(json_data) == 0:
+        total_rows = build_json_record_index(json_file_path)
+
+        if total_rows == 0:
             return {"error": "JSON file is empty"}
-        
-        # Get preview data
-        preview_data = json_data[:max_rows]
-        
+
+        start, stop = normalize_window(offset, max_rows, total_rows)
+        with open(_record_index_path(json_file_path), 'rb') as index_file:
+            # Entry 0 is the header
+            index_file.seek((start + 1) * _RECORD_INDEX_ENTRY.size)
+            window = index_file.read((stop - start) * _RECORD_INDEX_ENTRY.size)
+
+        preview_data = []
+        with open(json_file_path, 'rb') as f:
+            for record_start, record_end in _RECORD_INDEX_ENTRY.iter_unpack(window):
+                f.seek(record_start)
+                preview_data.append(json.loads(f.read(record_end - record_start).decode('utf-8')))
+
         # Get column names from first object
         if preview_data:
             columns = list(preview_data[0].keys())
         else:
             columns = []
-        
+
         return {
             "preview": preview_data,
             "columns": columns,
-            "total_rows": len(json_data)
+            "offset": start,
+            "total_rows": total_rows,
+            "next_offset": stop if stop < total_rows else None
         }
-        
+
     except json.JSONDecodeError as e:
         return {"error": f"Invalid JSON format: {str(e)}"}
+    except ValueError as e:
+        return {"error": str(e)}
     except Exception as e:
-        return {"error": f"Error reading JSON file: {str(e)}"}
\ No newline at end of file
+        return {"error": f"Error reading JSON file: {str(e)}"}
@@ -0,0 +1,280 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import threading
+import multiprocessing
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: admission is then only enforced within one process
+    fcntl = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Rough peak memory of a parse, as a multiple of the file size on disk.
+# xlsx is zipped XML and expands the most; CSV and JSON stay closer to their size.
+MEMORY_COST_FACTORS = {
+    '.xlsx': 30,
+    '.xls': 20,
+    '.csv': 8,
+    '.json': 10,
+}
+DEFAULT_MEMORY_COST_FACTOR = 10
+# Pasted text is parsed like a JSON or CSV file of the same size
+TEXT_MEMORY_COST_FACTOR = 10
+# Memory every job needs regardless of input size (interpreter, pandas, buffers)
+BASE_MEMORY_COST = 32 * 1024 * 1024
+# How often a worker subprocess checks that the process that started it is still alive
+PARENT_CHECK_INTERVAL = 0.5
+
+class AdmissionRejected(Exception):
+    """Raised when a job can't be admitted within the memory budget."""
+
+class WorkerLimitExceeded(RuntimeError):
+    """Raised when a worker subprocess is stopped for exceeding its CPU time or memory limit."""
+
+def create_work_dir(base_folder):
+    """
+    Creates a unique directory for one request, so concurrent uploads with the
+    same file name never overwrite each other.
+
+    :return: A tuple of (job_id, directory path).
+    """
+    job_id = uuid.uuid4().hex
+    work_dir = os.path.join(base_folder, job_id)
+    os.makedirs(work_dir)
+    return job_id, work_dir
+
+def cleanup_expired_work_dirs(base_folder, max_age_seconds):
+    """Removes work directories that haven't been modified for max_age_seconds."""
+    if not os.path.isdir(base_folder):
+        return
+    cutoff = time.time() - max_age_seconds
+    for entry in os.scandir(base_folder):
+        try:
+            if entry.is_dir(follow_symlinks=False) and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        except FileNotFoundError:
+            pass  # Removed by another worker in the meantime
+
+def estimate_memory_cost(file_path):
+    """
+    Estimates the peak memory in bytes needed to process a file, from its size and type.
+    """
+    _, extension = os.path.splitext(file_path)
+    factor = MEMORY_COST_FACTORS.get(extension.lower(), DEFAULT_MEMORY_COST_FACTOR)
+    return BASE_MEMORY_COST + os.path.getsize(file_path) * factor
+
+def estimate_text_memory_cost(text):
+    """
+    Estimates the peak memory in bytes needed to process text sent in a form,
+    such as pasted clipboard data.
+    """
+    return BASE_MEMORY_COST + len(text.encode('utf-8')) * TEXT_MEMORY_COST_FACTOR
+
+def _pid_alive(pid):
+    if os.name == 'nt':
+        return True  # os.kill would terminate the process on Windows
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class AdmissionController:
+    """
+    Admits jobs while the sum of their estimated memory costs stays under a budget.
+    Reservations are files in a shared state directory guarded by a file lock, so
+    the budget holds across all gunicorn workers on the host. Reservations left by
+    processes that died are ignored.
+    """
+
+    def __init__(self, state_dir, budget_bytes, queue_timeout=30, poll_interval=0.2):
+        self.state_dir = state_dir
+        self.budget_bytes = budget_bytes
+        self.queue_timeout = queue_timeout
+        self.poll_interval = poll_interval
+        os.makedirs(state_dir, exist_ok=True)
+        self._lock_path = os.path.join(state_dir, '.lock')
+
+    @contextmanager
+    def _locked(self):
+        os.makedirs(self.state_dir, exist_ok=True)
+        with open(self._lock_path, 'a') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _reserved_bytes(self):
+        """Sums the live reservations. Must be called with the lock held."""
+        total = 0
+        for entry in os.scandir(self.state_dir):
+            if not entry.name.endswith('.job'):
+                continue
+            try:
+                with open(entry.path, 'r') as f:
+                    reservation = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if _pid_alive(reservation['pid']):
+                total += reservation['cost']
+            else:
+                os.remove(entry.path)
+        return total
+
+    def _try_reserve(self, cost):
+        with self._locked():
+            if self._reserved_bytes() + cost > self.budget_bytes:
+                return None
+            path = os.path.join(self.state_dir, f"{uuid.uuid4().hex}.job")
+            with open(path, 'w') as f:
+                json.dump({'pid': os.getpid(), 'cost': cost}, f)
+            return path
+
+    @contextmanager
+    def admit(self, cost, timeout=None):
+        """
+        Waits until `cost` bytes fit in the budget and holds them for the duration of the block.
+        Raises AdmissionRejected if the job can never fit or the queue wait times out.
+
+        :param timeout: Maximum queue wait in seconds, defaults to queue_timeout.
+        """
+        if cost > self.budget_bytes:
+            raise AdmissionRejected(
+                f"File is too large to process (needs about {cost // (1024 * 1024)} MB, "
+                f"limit is {self.budget_bytes // (1024 * 1024)} MB)."
+            )
+
+        deadline = time.monotonic() + (self.queue_timeout if timeout is None else timeout)
+        reservation = self._try_reserve(cost)
+        while reservation is None:
+            if time.monotonic() >= deadline:
+                raise AdmissionRejected("Server is busy processing other files. Please try again shortly.")
+            time.sleep(self.poll_interval)
+            reservation = self._try_reserve(cost)
+
+        try:
+            yield
+        finally:
+            try:
+                os.remove(reservation)
+            except FileNotFoundError:
+                pass
+
+def _read_rss_bytes(pid):
+    """Returns the resident set size of a process, or None where /proc is not available."""
+    try:
+        with open(f'/proc/{pid}/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+def _exit_when_parent_dies(parent_pid):
+    """
+    Stops the worker once the process that started it is gone (e.g. a gunicorn worker
+    killed on timeout), so it doesn't keep using memory whose reservation was released.
+    """
+    while True:
+        time.sleep(PARENT_CHECK_INTERVAL)
+        if not _pid_alive(parent_pid):
+            os._exit(1)
+
+def _worker_main(conn, func, args, kwargs, cpu_seconds, parent_pid):
+    threading.Thread(target=_exit_when_parent_dies, args=(parent_pid,), daemon=True).start()
+    if resource is not None and cpu_seconds:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    try:
+        conn.send(('ok', func(*args, **kwargs)))
+    except ValueError as e:
+        conn.send(('value_error', str(e)))
+    except Exception as e:
+        conn.send(('error', str(e)))
+    finally:
+        conn.close()
+
+def _get_worker_context():
+    """
+    Returns the multiprocessing context used for workers. Forking directly from a
+    request thread of a threaded server can deadlock or crash the child on locks held
+    by other threads, so workers are forked from a single-threaded fork server instead
+    (or spawned where fork servers aren't available).
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        # Import pandas and the converters once in the fork server instead of in every worker
+        context.set_forkserver_preload(['excel_processor'])
+        return context
+    return multiprocessing.get_context('spawn')
+
+def run_in_worker(func, args=(), kwargs=None, cpu_seconds=None, max_rss_bytes=None, timeout=None):
+    """
+    Runs func(*args, **kwargs) in a subprocess and returns its result.
+    The subprocess gets an RLIMIT_CPU of cpu_seconds and is killed if its resident
+    memory goes above max_rss_bytes or it runs longer than timeout seconds, so one
+    huge file can only take down its own worker. It also exits on its own if the
+    calling process dies. func and its arguments must be picklable.
+
+    ValueErrors raised by func are re-raised as ValueError with the same message,
+    other errors as RuntimeError, and limit violations as WorkerLimitExceeded.
+    """
+    context = _get_worker_context()
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    process = context.Process(target=_worker_main,
+                              args=(child_conn, func, args, kwargs or {}, cpu_seconds, os.getpid()))
+    process.start()
+    child_conn.close()
+
+    started = time.monotonic()
+    try:
+        while True:
+            if parent_conn.poll(0.1):
+                try:
+                    status, payload = parent_conn.recv()
+                except EOFError:
+                    break  # Worker died before sending a result
+                process.join()
+                if status == 'ok':
+                    return payload
+                if status == 'value_error':
+                    raise ValueError(payload)
+                raise RuntimeError(payload)
+
+            if not process.is_alive():
+                # The result may have arrived between the poll above and the exit
+                if parent_conn.poll():
+                    continue
+                break
+            if max_rss_bytes:
+                rss = _read_rss_bytes(process.pid)
+                if rss is not None and rss > max_rss_bytes:
+                    process.kill()
+                    process.join()
+                    raise WorkerLimitExceeded("Conversion stopped: the file needs more memory than allowed.")
+            if timeout and time.monotonic() - started > timeout:
+                process.kill()
+                process.join()
+                raise WorkerLimitExceeded("Conversion stopped: it took longer than allowed.")
+    finally:
+        parent_conn.close()
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    process.join()
+    if process.exitcode == -24:  # SIGXCPU, sent when the soft CPU limit is reached
+        raise WorkerLimitExceeded("Conversion stopped: it used more CPU time than allowed.")
+    if process.exitcode == -9:  # Hard CPU limit or the kernel OOM killer
+        raise WorkerLimitExceeded("Conversion stopped: it ran out of CPU time or memory.")
+    raise WorkerLimitExceeded(f"Conversion worker exited unexpectedly (exit code {process.exitcode}).")
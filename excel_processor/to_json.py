@@ -1,14 +1,20 @@
 import pandas as pd
 import os
 import json
-from .utils import read_file_to_dataframe
+import uuid
+import struct
+import hashlib
+from .utils import RECORDS_CACHE_FOLDER, read_file_to_dataframe, normalize_window
+from .writers import json_default, build_output_path, normalize_compression, write_dataframe, write_json_records
 
-def _dataframe_to_records_with_nested_json(df):
+# Size of one entry in a records cache index (a little-endian int64 byte offset)
+RECORD_OFFSET_SIZE = 8
+
+def _iter_records_with_nested_json(df):
     """
-    Converts a DataFrame to a list of dictionaries, attempting to parse
+    Yields each row of a DataFrame as a dictionary, attempting to parse
     string values as nested JSON and handling NaNs.
     """
-    list_of_records = []
     for _, row in df.iterrows():
         record = {}
         for col_name, value in row.items():
@@ -22,16 +28,22 @@ def _dataframe_to_records_with_nested_json(df):
                     record[col_name] = value # Not a JSON string, keep as is
             else:
                 record[col_name] = value
-        list_of_records.append(record)
-        
-    return list_of_records
+        yield record
+
+def _dataframe_to_records_with_nested_json(df):
+    """
+    Converts a DataFrame to a list of dictionaries, attempting to parse
+    string values as nested JSON and handling NaNs.
+    """
+    return list(_iter_records_with_nested_json(df))
 
-def get_columns_as_json_records(file_path, column_names):
+def get_columns_as_json_records(file_path, column_names, filters=None, row_range=None):
     """
     Reads a file and returns the data from specific columns as a list of dictionaries.
     Handles NaN values and nested JSON strings.
+    Only rows inside row_range that match all filters are returned.
     """
-    df = read_file_to_dataframe(file_path)
+    df = read_file_to_dataframe(file_path, usecols=column_names, filters=filters, row_range=row_range)
     # Check if all requested columns exist
     for col in column_names:
         if col not in df.columns:
@@ -40,33 +52,130 @@ def get_columns_as_json_records(file_path, column_names):
     selected_df = df[column_names]
     return _dataframe_to_records_with_nested_json(selected_df)
 
-def convert_columns_to_json(file_path, column_names, output_folder):
+def _records_cache_paths(file_path, column_names, filters=None, row_range=None):
+    """
+    Returns the (data, index) paths of the records cache for one selection of a file.
+    The key covers the file's size and modification time, so a changed file gets a new cache.
+    """
+    stat = os.stat(file_path)
+    key = json.dumps([os.path.basename(file_path), stat.st_size, stat.st_mtime_ns,
+                      column_names, filters or [], list(row_range or ())], sort_keys=True, default=str)
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    cache_folder = os.path.join(os.path.dirname(file_path), RECORDS_CACHE_FOLDER)
+    return os.path.join(cache_folder, f"{digest}.ndjson"), os.path.join(cache_folder, f"{digest}.idx")
+
+def has_records_cache(file_path, column_names, filters=None, row_range=None):
+    """Checks whether build_records_cache has already been run for this selection."""
+    _, index_path = _records_cache_paths(file_path, column_names, filters, row_range)
+    return os.path.isfile(index_path)
+
+def build_records_cache(file_path, column_names, filters=None, row_range=None):
+    """
+    Parses a file once and stores the selected records next to it as NDJSON, together
+    with an index of the byte offset of every line. Pages are then read straight from
+    disk, so serving them needs neither the parsed DataFrame nor much memory.
+
+    :return: The number of records.
+    """
+    data_path, index_path = _records_cache_paths(file_path, column_names, filters, row_range)
+    if os.path.isfile(index_path):
+        return os.path.getsize(index_path) // RECORD_OFFSET_SIZE - 1
+
+    df = read_file_to_dataframe(file_path, usecols=column_names, filters=filters, row_range=row_range)
+    for col in column_names:
+        if col not in df.columns:
+            raise ValueError(f"Column '{col}' not found in the file.")
+
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+    # Written under temporary names and renamed, so a concurrent reader never sees a partial cache
+    suffix = f".{uuid.uuid4().hex}.tmp"
+    total_rows = 0
+    with open(data_path + suffix, 'wb') as data_file, open(index_path + suffix, 'wb') as index_file:
+        position = 0
+        for record in _iter_records_with_nested_json(df[column_names]):
+            line = (json.dumps(record, ensure_ascii=False, default=json_default) + '\n').encode('utf-8')
+            index_file.write(struct.pack('<q', position))
+            data_file.write(line)
+            position += len(line)
+            total_rows += 1
+        index_file.write(struct.pack('<q', position))
+    os.replace(data_path + suffix, data_path)
+    os.replace(index_path + suffix, index_path)
+    return total_rows
+
+def _read_record_offset(index_file, row):
+    index_file.seek(row * RECORD_OFFSET_SIZE)
+    return struct.unpack('<q', index_file.read(RECORD_OFFSET_SIZE))[0]
+
+def get_json_records_page(file_path, column_names, offset=0, limit=100, filters=None, row_range=None):
+    """
+    Returns one window of the records produced by get_columns_as_json_records.
+    The records are read from the cache written by build_records_cache (built first
+    if it doesn't exist yet), so only the requested window is loaded.
+    """
+    build_records_cache(file_path, column_names, filters, row_range)
+    data_path, index_path = _records_cache_paths(file_path, column_names, filters, row_range)
+
+    with open(index_path, 'rb') as index_file:
+        total_rows = os.fstat(index_file.fileno()).st_size // RECORD_OFFSET_SIZE - 1
+        start, stop = normalize_window(offset, limit, total_rows)
+        start_position = _read_record_offset(index_file, start)
+        stop_position = _read_record_offset(index_file, stop)
+
+    with open(data_path, 'rb') as data_file:
+        data_file.seek(start_position)
+        # Split on b'\n' only: str.splitlines() would also split on U+0085/U+2028/U+2029,
+        # which ensure_ascii=False leaves unescaped inside strings
+        lines = data_file.read(stop_position - start_position).split(b'\n')[:-1]
+
+    return {
+        "records": [json.loads(line.decode('utf-8')) for line in lines],
+        "offset": start,
+        "total_rows": total_rows,
+        "next_offset": stop if stop < total_rows else None
+    }
+
+def convert_columns_to_json(file_path, column_names, output_folder, filters=None, row_range=None,
+                            output_format='json', compression=None):
     """
     Reads an Excel or CSV file, extracts specific columns, and saves them as a JSON file.
+    The output can also be NDJSON or Parquet, and text outputs can be gzip/zstd compressed
+    while they are written.
     """
     try:
-        json_records = get_columns_as_json_records(file_path, column_names)
-        
+        if output_format not in ['json', 'ndjson', 'parquet']:
+            raise ValueError(f"Unsupported output format: {output_format}")
+        compression = normalize_compression(compression)
+
+        df = read_file_to_dataframe(file_path, usecols=column_names, filters=filters, row_range=row_range)
+        selected_df = df[column_names]
+
         base_filename = os.path.basename(file_path)
         name, _ = os.path.splitext(base_filename)
-        output_filename = f"{name}_selected_columns.json"
-        output_path = os.path.join(output_folder, output_filename)
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(json_records, f, indent=4, ensure_ascii=False)
+        output_path = build_output_path(output_folder, f"{name}_selected_columns", output_format, compression)
+
+        if output_format == 'parquet':
+            # Parquet keeps the column types, so nested JSON strings are stored as-is
+            write_dataframe(selected_df, output_path, 'parquet', compression)
+        else:
+            write_json_records(_iter_records_with_nested_json(selected_df), output_path, output_format, compression)
             
         return output_path
+    except ValueError:
+        # Invalid input such as a missing column or a bad filter is reported to the caller
+        raise
     except Exception as e:
         print(f"An error occurred in convert_columns_to_json: {e}")
         return None
 
-def add_json_column_to_file(file_path, column_names, output_folder):
+def add_json_column_to_file(file_path, column_names, output_folder, filters=None, row_range=None):
     """
     Adds a new column to the original file, where each cell contains a JSON object
-    of the selected columns for that row.
+    of the selected columns for that row. When filters or a row range are given,
+    only the matching rows are written to the new file.
     """
     try:
-        df = read_file_to_dataframe(file_path)
+        df = read_file_to_dataframe(file_path, filters=filters, row_range=row_range)
         # Check if all requested columns exist
         for col in column_names:
             if col not in df.columns:
@@ -92,6 +201,9 @@ def add_json_column_to_file(file_path, column_names, output_folder):
             raise ValueError(f"Unsupported output file format: {ext}")
 
         return output_path
+    except ValueError:
+        # Invalid input such as a missing column or a bad filter is reported to the caller
+        raise
     except Exception as e:
         print(f"An error occurred in add_json_column_to_file: {e}")
         return None
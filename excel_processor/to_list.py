@@ -1,18 +1,23 @@
 import pandas as pd
 import os
 from .utils import read_file_to_dataframe
+from .filters import apply_filters
 import io
 
-def get_column_data(file_or_df, column_name, nan_handling='remove'):
+def get_column_data(file_or_df, column_name, nan_handling='remove', filters=None, row_range=None):
     """
     Extracts a column from a file path or a DataFrame.
     Handles NaN values by either removing them or keeping them (for later conversion to null).
+    Only rows inside row_range that match all filters are returned.
     """
     try:
         if isinstance(file_or_df, str):
-            df = read_file_to_dataframe(file_or_df)
+            df = read_file_to_dataframe(file_or_df, usecols=[column_name], filters=filters, row_range=row_range)
         else:
             df = file_or_df
+            if row_range:
+                df = df.iloc[row_range[0]:row_range[1]]
+            df = apply_filters(df, filters)
 
         if column_name not in df.columns:
             raise ValueError(f"Column '{column_name}' not found in the file.")
@@ -30,10 +35,10 @@ def get_column_data(file_or_df, column_name, nan_handling='remove'):
         print(f"Error in get_column_data: {e}")
         raise
 
-def convert_column_to_list(file_path, column_name, output_folder, nan_handling='remove'):
+def convert_column_to_list(file_path, column_name, output_folder, nan_handling='remove', filters=None, row_range=None):
     """Converts a specific column from an Excel or CSV file to a text file, with each item on a new line."""
     try:
-        column_data = get_column_data(file_path, column_name, nan_handling)
+        column_data = get_column_data(file_path, column_name, nan_handling, filters, row_range)
         
         # Generate output filename
         base_filename = os.path.basename(file_path)
@@ -1,17 +1,84 @@
 import pandas as pd
 import os
+from .filters import apply_filters, filter_columns
 
-def read_file_to_dataframe(file_path):
+# Rows parsed at a time when filtering a CSV file
+CSV_CHUNK_SIZE = 50000
+
+# Folder next to an uploaded file where data derived from it (parsed records, offset indexes) is cached
+RECORDS_CACHE_FOLDER = '.records'
+
+def read_file_header(file_path):
     """
-    Reads a file into a pandas DataFrame, supporting both Excel and CSV.
-    
+    Reads only the header row of an Excel or CSV file.
+
     :param file_path: Path to the input Excel or CSV file.
-    :return: A pandas DataFrame.
+    :return: A list of column names.
     """
     _, extension = os.path.splitext(file_path)
     if extension.lower() in ['.xlsx', '.xls']:
-        return pd.read_excel(file_path)
+        return pd.read_excel(file_path, nrows=0).columns.tolist()
     elif extension.lower() == '.csv':
-        return pd.read_csv(file_path, encoding='utf-8')
+        return pd.read_csv(file_path, encoding='utf-8', nrows=0).columns.tolist()
     else:
         raise ValueError(f"Unsupported file type: {extension}")
+
+def read_file_to_dataframe(file_path, usecols=None, filters=None, row_range=None):
+    """
+    Reads a file into a pandas DataFrame, supporting both Excel and CSV.
+    Column selection, row filters and row slices are pushed down to the reader,
+    so CSV rows that don't match are dropped chunk by chunk instead of being kept in memory.
+    
+    :param file_path: Path to the input Excel or CSV file.
+    :param usecols: Optional list of columns to read (filter columns are added automatically).
+    :param filters: Optional list of filters as returned by parse_filters.
+    :param row_range: Optional (start, stop) data row slice as returned by parse_row_range.
+    :return: A pandas DataFrame.
+    """
+    _, extension = os.path.splitext(file_path)
+    extension = extension.lower()
+    if extension not in ['.xlsx', '.xls', '.csv']:
+        raise ValueError(f"Unsupported file type: {extension}")
+
+    read_kwargs = {}
+    if usecols is not None or filters:
+        header = read_file_header(file_path)
+        needed = list(usecols) if usecols is not None else header
+        needed = list(dict.fromkeys(needed + filter_columns(filters)))
+        for col in needed:
+            if col not in header:
+                raise ValueError(f"Column '{col}' not found in the file.")
+        if usecols is not None:
+            read_kwargs['usecols'] = needed
+    if row_range:
+        start, stop = row_range
+        if start:
+            read_kwargs['skiprows'] = range(1, start + 1)
+        if stop is not None:
+            read_kwargs['nrows'] = stop - start
+
+    if extension in ['.xlsx', '.xls']:
+        return apply_filters(pd.read_excel(file_path, **read_kwargs), filters)
+
+    if not filters:
+        return pd.read_csv(file_path, encoding='utf-8', **read_kwargs)
+
+    chunks = [
+        apply_filters(chunk, filters)
+        for chunk in pd.read_csv(file_path, encoding='utf-8', chunksize=CSV_CHUNK_SIZE, **read_kwargs)
+    ]
+    if not chunks:
+        return pd.read_csv(file_path, encoding='utf-8', nrows=0, usecols=read_kwargs.get('usecols'))
+    return pd.concat(chunks, ignore_index=True)
+
+def normalize_window(offset, limit, total_rows):
+    """
+    Clamps an offset/limit pair to the bounds of a result set.
+
+    :return: A tuple of (start, stop) row positions.
+    """
+    offset = max(int(offset or 0), 0)
+    limit = max(int(limit or 0), 0)
+    start = min(offset, total_rows)
+    stop = min(start + limit, total_rows)
+    return start, stop
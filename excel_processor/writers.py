@@ -0,0 +1,145 @@
+import gzip
+import io
+import json
+import os
+import textwrap
+from contextlib import contextmanager
+import pandas as pd
+
+# File suffix appended to the output name for each supported compression
+COMPRESSION_SUFFIXES = {
+    'gzip': '.gz',
+    'zstd': '.zst',
+}
+
+# Value types pyarrow can store in a Parquet column of an object dtype DataFrame column
+PARQUET_OBJECT_TYPES = {'string', 'empty', 'boolean', 'integer', 'floating', 'mixed-integer-float',
+                        'decimal', 'date', 'datetime', 'bytes'}
+
+# Output formats that are plain text and can be stream-compressed
+TEXT_OUTPUT_FORMATS = {'json', 'ndjson', 'csv'}
+
+def normalize_compression(compression):
+    """
+    Validates a compression option, mapping empty values and 'none' to None.
+    """
+    if not compression or compression == 'none':
+        return None
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unsupported compression: {compression}")
+    return compression
+
+def build_output_path(output_folder, name, extension, compression=None):
+    """
+    Builds the path of an output file, adding the compression suffix for text formats.
+    Parquet files are compressed internally and keep their plain extension.
+    """
+    filename = f"{name}.{extension}"
+    if compression and extension in TEXT_OUTPUT_FORMATS:
+        filename += COMPRESSION_SUFFIXES[compression]
+    return os.path.join(output_folder, filename)
+
+@contextmanager
+def open_text_output(output_path, compression=None):
+    """
+    Opens a text file for writing, compressing the data while it is written
+    so large outputs never need a second compression pass.
+    """
+    if compression == 'gzip':
+        stream = gzip.open(output_path, 'wt', encoding='utf-8', newline='')
+    elif compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("zstd compression requires the 'zstandard' package")
+        raw = open(output_path, 'wb')
+        writer = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        stream = io.TextIOWrapper(writer, encoding='utf-8', newline='')
+    else:
+        stream = open(output_path, 'w', encoding='utf-8', newline='')
+
+    try:
+        yield stream
+    finally:
+        stream.close()
+
+def json_default(value):
+    """Converts numpy and pandas scalars that the json module can't encode."""
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def write_json_records(records, output_path, output_format='json', compression=None):
+    """
+    Writes an iterable of records as a JSON array (indented like json.dump(indent=4))
+    or as newline-delimited JSON, one record at a time.
+    """
+    with open_text_output(output_path, compression) as f:
+        if output_format == 'ndjson':
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, default=json_default))
+                f.write('\n')
+            return
+
+        first = True
+        for record in records:
+            f.write('[\n' if first else ',\n')
+            f.write(textwrap.indent(json.dumps(record, indent=4, ensure_ascii=False, default=json_default), '    '))
+            first = False
+        f.write('[]' if first else '\n]')
+
+def write_dataframe(df, output_path, output_format, compression=None):
+    """
+    Writes a DataFrame as CSV, NDJSON, Parquet or Excel.
+    """
+    if output_format == 'csv':
+        with open_text_output(output_path, compression) as f:
+            df.to_csv(f, index=False)
+    elif output_format == 'ndjson':
+        columns = list(df.columns)
+        records = (
+            {col: (None if _is_missing(value) else value) for col, value in zip(columns, row)}
+            for row in df.itertuples(index=False, name=None)
+        )
+        write_json_records(records, output_path, 'ndjson', compression)
+    elif output_format == 'parquet':
+        try:
+            _prepare_for_parquet(df).to_parquet(output_path, index=False, compression=compression or 'snappy')
+        except ImportError:
+            raise ValueError("Parquet output requires the 'pyarrow' package")
+    elif output_format in ['xlsx', 'xls']:
+        if compression:
+            raise ValueError("Compression is not supported for Excel output")
+        df.to_excel(output_path, index=False)
+    else:
+        raise ValueError(f"Unsupported output format: {output_format}")
+
+def _prepare_for_parquet(df):
+    """
+    Casts object columns that mix value types (e.g. numbers and text, or nested
+    lists and dicts) to text, as a Parquet column holds a single type.
+    """
+    mixed_columns = [
+        col for col in df.columns
+        if df[col].dtype == object and pd.api.types.infer_dtype(df[col], skipna=True) not in PARQUET_OBJECT_TYPES
+    ]
+    if not mixed_columns:
+        return df
+    df = df.copy()
+    for col in mixed_columns:
+        df[col] = df[col].map(_to_text)
+    return df
+
+def _to_text(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=json_default)
+    return None if _is_missing(value) else str(value)
+
+def _is_missing(value):
+    """Checks for NaN/None without failing on lists and dicts."""
+    try:
+        return value is None or value != value
+    except (TypeError, ValueError):
+        return False
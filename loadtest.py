@@ -0,0 +1,487 @@
+"""
+Load-test harness for GTools.
+
+Replays a weighted mix of /api/get-headers, /convert/list, /convert/json,
+/convert/from-json and /convert/clipboard requests with synthetic files of
+several sizes at a fixed concurrency, then reports throughput, latency
+percentiles, error rates and peak memory.
+
+Requests are sent over HTTP to a running server given with --url, normally
+gunicorn started as in Dockerfile.production, and --server-pid with the gunicorn
+master PID samples its workers' memory. --in-process sends them through the Flask
+test client in this process instead. That mode runs every client as a thread of a
+single interpreter, unlike gunicorn's worker processes, so it is only a smoke test
+and its latency and throughput figures are not representative.
+
+Examples:
+    python loadtest.py --url http://localhost:5000 --server-pid 1234 --duration 60 \\
+        --mix get-headers=2,list=3,json=3,from-json=1,clipboard=1 --sizes 1000,50000
+    python loadtest.py --in-process --requests 50 --concurrency 4
+"""
+import argparse
+import io
+import json
+import math
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+ENDPOINTS = {
+    'get-headers': '/api/get-headers',
+    'list': '/convert/list',
+    'json': '/convert/json',
+    'from-json': '/convert/from-json',
+    'clipboard': '/convert/clipboard',
+}
+DEFAULT_MIX = 'get-headers=2,list=3,json=3,from-json=1,clipboard=1'
+# Command line markers of the helper processes multiprocessing starts next to a worker
+MULTIPROCESSING_HELPERS = ('multiprocessing.forkserver', 'multiprocessing.resource_tracker')
+# Rows of the synthetic clipboard payload, kept small as it is sent as a form field
+CLIPBOARD_MAX_ROWS = 5000
+
+def parse_mix(mix):
+    """
+    Parses a 'name=weight,...' traffic mix into a dictionary of endpoint weights.
+    """
+    weights = {}
+    for item in mix.split(','):
+        name, _, weight = item.strip().partition('=')
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint in mix: {name} (expected one of {', '.join(ENDPOINTS)})")
+        weights[name] = float(weight or 1)
+    if not any(weights.values()):
+        raise ValueError("The traffic mix needs at least one endpoint with a positive weight")
+    return weights
+
+def build_dataset(rows, seed=0):
+    """
+    Builds a DataFrame resembling typical uploads: ids, text, numbers,
+    missing values and a column of nested JSON strings.
+    """
+    rng = random.Random(seed)
+    cities = ['Paris', 'Rome', 'Oslo', 'Berlin', 'Madrid', None]
+    return pd.DataFrame({
+        'id': range(rows),
+        'name': [f"user_{i}" for i in range(rows)],
+        'city': [rng.choice(cities) for _ in range(rows)],
+        'score': [round(rng.random() * 100, 2) for _ in range(rows)],
+        'payload': [json.dumps({'tags': [rng.randint(0, 9) for _ in range(3)], 'active': rng.random() > 0.5})
+                    for _ in range(rows)],
+    })
+
+def generate_files(output_dir, sizes, formats, seed=0):
+    """
+    Writes one synthetic file per size and upload format (csv, xlsx),
+    plus a JSON file per size for /convert/from-json.
+
+    :return: A dictionary mapping format to a list of (rows, file path).
+    """
+    files = defaultdict(list)
+    for rows in sizes:
+        df = build_dataset(rows, seed)
+        for file_format in formats:
+            path = os.path.join(output_dir, f"loadtest_{rows}.{file_format}")
+            if file_format == 'csv':
+                df.to_csv(path, index=False)
+            else:
+                df.to_excel(path, index=False)
+            files[file_format].append((rows, path))
+        path = os.path.join(output_dir, f"loadtest_{rows}.json")
+        df.to_json(path, orient='records', force_ascii=False)
+        files['json'].append((rows, path))
+    return files
+
+def build_request(endpoint, files, rng):
+    """
+    Picks a synthetic file and form fields for one request.
+
+    :return: A tuple of (size label, form fields, (field name, file path) or None).
+    """
+    table_files = files['csv'] + files['xlsx']
+    if endpoint == 'clipboard':
+        rows, path = rng.choice(files['csv'] or table_files)
+        df = pd.read_csv(path, nrows=CLIPBOARD_MAX_ROWS) if path.endswith('.csv') else pd.read_excel(path, nrows=CLIPBOARD_MAX_ROWS)
+        data = df[['name', 'city']].to_csv(sep='\t', index=False)
+        return min(rows, CLIPBOARD_MAX_ROWS), {'data': data, 'action': 'to_list', 'list_output_method': 'display'}, None
+    if endpoint == 'from-json':
+        rows, path = rng.choice(files['json'])
+        return rows, {'output_format': rng.choice(['csv', 'ndjson'])}, ('file', path)
+
+    rows, path = rng.choice(table_files)
+    if endpoint == 'get-headers':
+        fields = {}
+    elif endpoint == 'list':
+        fields = {'column_name': 'name', 'output_method': rng.choice(['file', 'display'])}
+    else:
+        fields = {'column_names': ['id', 'name', 'payload'], 'output_method': rng.choice(['file', 'display', 'add_to_table'])}
+    return rows, fields, ('file', path)
+
+def _encode_multipart(fields, upload):
+    """Encodes form fields and an optional file as a multipart/form-data body."""
+    boundary = uuid.uuid4().hex
+    body = io.BytesIO()
+    for name, values in fields.items():
+        for value in values if isinstance(values, list) else [values]:
+            body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'.encode('utf-8'))
+            body.write(str(value).encode('utf-8') + b'\r\n')
+    if upload:
+        field_name, path = upload
+        body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{field_name}"; '
+                   f'filename="{os.path.basename(path)}"\r\nContent-Type: application/octet-stream\r\n\r\n'.encode('utf-8'))
+        with open(path, 'rb') as f:
+            body.write(f.read())
+        body.write(b'\r\n')
+    body.write(f'--{boundary}--\r\n'.encode('utf-8'))
+    return body.getvalue(), f'multipart/form-data; boundary={boundary}'
+
+class HttpTarget:
+    """Sends requests to a running server over HTTP."""
+
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def post(self, path, fields, upload):
+        body, content_type = _encode_multipart(fields, upload)
+        req = urllib.request.Request(self.base_url + path, data=body, method='POST',
+                                     headers={'Content-Type': content_type})
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+class FlaskTarget:
+    """
+    Sends requests through the Flask test client, one client per thread. All clients
+    share this interpreter, so this is only a smoke test, not a model of gunicorn.
+    """
+
+    def __init__(self):
+        from app import app
+        self.app = app
+        self._local = threading.local()
+
+    def post(self, path, fields, upload):
+        if not hasattr(self._local, 'client'):
+            self._local.client = self.app.test_client()
+        data = dict(fields)
+        handle = None
+        if upload:
+            field_name, file_path = upload
+            handle = open(file_path, 'rb')
+            data[field_name] = (handle, os.path.basename(file_path))
+        try:
+            response = self._local.client.post(path, data=data)
+            return response.status_code, response.get_data()
+        finally:
+            if handle:
+                handle.close()
+
+def _children(pid):
+    """
+    Returns the PIDs of the children of a process (Linux only). Children are listed
+    per thread that started them, so every thread of the process is read.
+    """
+    children = []
+    try:
+        threads = os.listdir(f'/proc/{pid}/task')
+    except OSError:
+        return children
+    for thread in threads:
+        try:
+            with open(f'/proc/{pid}/task/{thread}/children', 'r') as f:
+                children.extend(int(child) for child in f.read().split())
+        except OSError:
+            continue
+    return children
+
+def _process_tree(pid):
+    """Returns the PIDs of all descendants of a process (Linux only)."""
+    descendants = []
+    pending = [pid]
+    while pending:
+        children = _children(pending.pop())
+        descendants.extend(children)
+        pending.extend(children)
+    return descendants
+
+def _read_status_kb(pid, field):
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def _is_multiprocessing_helper(pid):
+    """Checks whether a process is a multiprocessing fork server or resource tracker (Linux only)."""
+    try:
+        with open(f'/proc/{pid}/cmdline', 'rb') as f:
+            cmdline = f.read().decode('utf-8', 'replace')
+    except OSError:
+        return False
+    return any(helper in cmdline for helper in MULTIPROCESSING_HELPERS)
+
+class ServerMemorySampler(threading.Thread):
+    """
+    Samples the resident memory of a gunicorn master's workers and of the
+    conversion subprocesses they start, keeping the peak seen for each worker.
+    The fork server each worker starts its conversions from preloads pandas and
+    stays up while idle, so it is sampled separately from the conversions.
+    With single_process, pid is sampled as the only worker (for in-process runs).
+    """
+
+    def __init__(self, pid, interval=0.2, single_process=False):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.single_process = single_process
+        self.worker_peaks_kb = defaultdict(int)
+        self.subprocess_peak_kb = 0
+        self.fork_server_peak_kb = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            workers = [self.pid] if self.single_process else _children(self.pid)
+            for worker in workers:
+                rss = _read_status_kb(worker, 'VmRSS')
+                if rss:
+                    self.worker_peaks_kb[worker] = max(self.worker_peaks_kb[worker], rss)
+                for child in _children(worker):
+                    # Conversion workers are forked from the fork server and share its
+                    # command line, so helpers can only be told apart as direct children
+                    if _is_multiprocessing_helper(child):
+                        self.fork_server_peak_kb = max(self.fork_server_peak_kb, _read_status_kb(child, 'VmRSS') or 0)
+                        conversions = _process_tree(child)
+                    else:
+                        conversions = [child] + _process_tree(child)
+                    for conversion in conversions:
+                        rss = _read_status_kb(conversion, 'VmRSS')
+                        if rss:
+                            self.subprocess_peak_kb = max(self.subprocess_peak_kb, rss)
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+def percentile(values, pct):
+    """Returns the pct-th percentile of a list of numbers (nearest-rank)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100.0 * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+def run_load(target, files, weights, concurrency, total_requests=None, duration=None, seed=0):
+    """
+    Sends requests at the given concurrency until total_requests have been sent
+    or duration seconds have passed.
+
+    :return: A tuple of (list of result dictionaries, elapsed seconds).
+    """
+    names = list(weights)
+    lock = threading.Lock()
+    results = []
+    counter = {'sent': 0}
+    started = time.monotonic()
+
+    def next_slot():
+        with lock:
+            if total_requests is not None and counter['sent'] >= total_requests:
+                return None
+            if duration is not None and time.monotonic() - started >= duration:
+                return None
+            counter['sent'] += 1
+            return counter['sent']
+
+    def client_loop(client_index):
+        rng = random.Random(seed * 1000 + client_index)
+        while next_slot() is not None:
+            endpoint = rng.choices(names, weights=[weights[name] for name in names])[0]
+            rows, fields, upload = build_request(endpoint, files, rng)
+            request_started = time.monotonic()
+            try:
+                status, _ = target.post(ENDPOINTS[endpoint], fields, upload)
+            except Exception as e:
+                status = f"exception: {type(e).__name__}"
+            latency = time.monotonic() - request_started
+            with lock:
+                results.append({'endpoint': endpoint, 'rows': rows, 'status': status, 'latency': latency})
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(client_loop, i) for i in range(concurrency)]:
+            future.result()
+    return results, time.monotonic() - started
+
+def summarize(results, elapsed):
+    """Aggregates request results into overall and per-endpoint statistics."""
+    def stats(items):
+        latencies = [item['latency'] for item in items]
+        errors = [item for item in items if not (isinstance(item['status'], int) and item['status'] < 400)]
+        statuses = defaultdict(int)
+        for item in items:
+            statuses[str(item['status'])] += 1
+        return {
+            'requests': len(items),
+            'errors': len(errors),
+            'error_rate': len(errors) / len(items) if items else 0.0,
+            'p50_ms': _ms(percentile(latencies, 50)),
+            'p95_ms': _ms(percentile(latencies, 95)),
+            'p99_ms': _ms(percentile(latencies, 99)),
+            'max_ms': _ms(max(latencies) if latencies else None),
+            'statuses': dict(statuses),
+        }
+
+    by_endpoint = defaultdict(list)
+    for item in results:
+        by_endpoint[item['endpoint']].append(item)
+
+    summary = stats(results)
+    summary['elapsed_s'] = round(elapsed, 2)
+    summary['throughput_rps'] = round(len(results) / elapsed, 2) if elapsed else 0.0
+    summary['endpoints'] = {name: stats(items) for name, items in sorted(by_endpoint.items())}
+    return summary
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
+
+def local_memory_usage(subprocess_peak_kb):
+    """Peak RSS of this process and of the largest conversion subprocess sampled, in MB (POSIX only)."""
+    if resource is None:
+        return {}
+    # ru_maxrss is in KB on Linux
+    return {
+        'app_process_peak_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'conversion_subprocess_peak_mb': round(subprocess_peak_kb / 1024, 1),
+    }
+
+def format_report(summary):
+    """Formats a summary as a plain-text table."""
+    lines = []
+    if summary.get('mode') == 'in-process':
+        lines += [
+            'Warning: in-process run. Requests went through the Flask test client, with every client',
+            'a thread of this interpreter, so latency and throughput are not representative of',
+            'gunicorn. Use --url against a running server for real figures.',
+            '',
+        ]
+    lines += [
+        f"Requests: {summary['requests']} in {summary['elapsed_s']}s "
+        f"({summary['throughput_rps']} req/s), errors: {summary['errors']} ({summary['error_rate']:.1%})",
+        '',
+        f"{'endpoint':<14}{'requests':>10}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}",
+    ]
+    rows = list(summary['endpoints'].items()) + [('all', summary)]
+    for name, stats in rows:
+        lines.append(
+            f"{name:<14}{stats['requests']:>10}{stats['errors']:>8}"
+            f"{_fmt(stats['p50_ms']):>10}{_fmt(stats['p95_ms']):>10}{_fmt(stats['p99_ms']):>10}{_fmt(stats['max_ms']):>10}"
+        )
+    lines.append('')
+    lines.append('Status codes: ' + ', '.join(f"{code}: {count}" for code, count in sorted(summary['statuses'].items())))
+
+    memory = summary.get('memory', {})
+    if 'workers_peak_mb' in memory:
+        for pid, peak in sorted(memory['workers_peak_mb'].items()):
+            lines.append(f"Worker {pid} peak RSS: {peak} MB")
+        lines.append(f"Conversion subprocess peak RSS: {memory['conversion_subprocess_peak_mb']} MB")
+    elif memory:
+        lines.append(f"App process peak RSS: {memory['app_process_peak_mb']} MB")
+        lines.append(f"Conversion subprocess peak RSS: {memory['conversion_subprocess_peak_mb']} MB")
+    if 'fork_server_peak_mb' in memory:
+        lines.append(f"Fork server peak RSS: {memory['fork_server_peak_mb']} MB")
+    return '\n'.join(lines)
+
+def _fmt(value):
+    return '-' if value is None else f"{value:.1f}"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Replay mixed GTools traffic and report latency, errors and memory.')
+    parser.add_argument('--url', help='Base URL of a running server, e.g. gunicorn started as in Dockerfile.production.')
+    parser.add_argument('--in-process', action='store_true',
+                        help='Send requests through the Flask test client in this process instead of --url. '
+                             'Clients are threads of one interpreter, so results are not representative.')
+    parser.add_argument('--server-pid', type=int, help='PID of the gunicorn master, to sample worker memory (Linux only).')
+    parser.add_argument('--concurrency', type=int, default=4, help='Number of concurrent clients (default: 4).')
+    parser.add_argument('--requests', type=int, help='Total number of requests to send (default: 100 unless --duration is set).')
+    parser.add_argument('--duration', type=float, help='Run for this many seconds instead of a fixed request count.')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Weighted endpoint mix (default: {DEFAULT_MIX}).')
+    parser.add_argument('--sizes', default='100,5000,50000', help='Comma-separated row counts of the synthetic files.')
+    parser.add_argument('--formats', default='csv,xlsx', help='Comma-separated upload formats: csv, xlsx (default: csv,xlsx).')
+    parser.add_argument('--timeout', type=float, default=300, help='Per-request timeout in seconds for --url (default: 300).')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the data and the request sequence.')
+    parser.add_argument('--json', action='store_true', help='Print the summary as JSON.')
+    args = parser.parse_args(argv)
+
+    if bool(args.url) == args.in_process:
+        parser.error('pass either --url of a running server (e.g. gunicorn) or --in-process for a smoke test')
+
+    weights = parse_mix(args.mix)
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    formats = [file_format.strip() for file_format in args.formats.split(',') if file_format.strip()]
+    for file_format in formats:
+        if file_format not in ('csv', 'xlsx'):
+            parser.error(f"Unsupported upload format: {file_format}")
+    total_requests = args.requests if args.requests or args.duration else 100
+
+    data_dir = tempfile.mkdtemp(prefix='gtools-loadtest-')
+    try:
+        files = generate_files(data_dir, sizes, formats, args.seed)
+        target = FlaskTarget() if args.in_process else HttpTarget(args.url, args.timeout)
+
+        sampler = None
+        if args.server_pid:
+            sampler = ServerMemorySampler(args.server_pid)
+        elif args.in_process:
+            # Conversion workers are forked by this process's fork server, not by this
+            # process itself, so they are sampled as its descendants
+            sampler = ServerMemorySampler(os.getpid(), single_process=True)
+        if sampler:
+            sampler.start()
+        try:
+            results, elapsed = run_load(target, files, weights, args.concurrency,
+                                        total_requests, args.duration, args.seed)
+        finally:
+            if sampler:
+                sampler.stop()
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    summary = summarize(results, elapsed)
+    summary['mode'] = 'in-process' if args.in_process else 'http'
+    if args.server_pid:
+        summary['memory'] = {
+            'workers_peak_mb': {str(pid): round(kb / 1024, 1) for pid, kb in sampler.worker_peaks_kb.items()},
+            'conversion_subprocess_peak_mb': round(sampler.subprocess_peak_kb / 1024, 1),
+            'fork_server_peak_mb': round(sampler.fork_server_peak_kb / 1024, 1),
+        }
+    elif args.in_process:
+        summary['memory'] = local_memory_usage(sampler.subprocess_peak_kb)
+        if summary['memory']:
+            summary['memory']['fork_server_peak_mb'] = round(sampler.fork_server_peak_kb / 1024, 1)
+
+    print(json.dumps(summary, indent=4) if args.json else format_report(summary))
+    return 0 if summary['requests'] else 1
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -33,6 +33,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
             if (response.ok && resultContent) {
                 resultContent.innerHTML = ''; // Clear previous results
+                resultContent.onscroll = null;
                 if (result.download_url) {
                     const downloadLink = document.createElement('a');
                     downloadLink.id = 'download-link';
@@ -50,6 +51,9 @@ document.addEventListener('DOMContentLoaded', () => {
                         pre.textContent = result.data;
                     }
                     resultContent.appendChild(pre);
+                    if (result.file_id && result.next_offset !== null && result.next_offset !== undefined) {
+                        attachPagedLoader(pre, result, recordsPageFetcher(result.file_id, formData));
+                    }
                     if (copyBtn) copyBtn.style.display = 'inline-block'; // Show button when display
                 }
                 resultContainer.style.display = 'block';
@@ -93,6 +97,11 @@ document.addEventListener('DOMContentLoaded', () => {
         jsonFileInput.addEventListener('change', (e) => handleFileSelect(e, 'json-columns-container', 'json-select-all-btn', 'checkbox'));
     }
 
+    const fromJsonFileInput = document.getElementById('from-json-file');
+    if (fromJsonFileInput) {
+        fromJsonFileInput.addEventListener('change', (e) => handleJsonPreview(e, 'from-json-preview'));
+    }
+
     const selectAllBtn = document.getElementById('json-select-all-btn');
     if (selectAllBtn) {
         selectAllBtn.addEventListener('click', () => {
@@ -130,6 +139,133 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 });
 
+// Formats records as the elements of a JSON.stringify(records, null, 2) array
+function formatRecords(records) {
+    return records
+        .map(record => '  ' + JSON.stringify(record, null, 2).replace(/\n/g, '\n  '))
+        .join(',\n');
+}
+
+// Fetches further windows of a paged result as the user scrolls to the end of it.
+// fetchPage(offset) resolves to { records, nextOffset } and throws on errors.
+function attachPagedLoader(pre, firstPage, fetchPage) {
+    let loadedRows = firstPage.data.length;
+    let nextOffset = firstPage.next_offset;
+    let loading = false;
+
+    // Each window is appended before the closing bracket, so loaded records are never re-serialized
+    const closing = document.createTextNode('\n]');
+    pre.textContent = firstPage.data.length > 0 ? '[\n' + formatRecords(firstPage.data) : '[';
+    pre.appendChild(closing);
+
+    const status = document.createElement('p');
+    status.className = 'placeholder-text';
+    pre.after(status);
+
+    const updateStatus = () => {
+        status.textContent = nextOffset === null
+            ? `Showing all ${firstPage.total_rows} rows.`
+            : `Showing ${loadedRows} of ${firstPage.total_rows} rows. Scroll down to load more.`;
+    };
+
+    const loadNextPage = async () => {
+        if (loading || nextOffset === null) return;
+        loading = true;
+
+        try {
+            const page = await fetchPage(nextOffset);
+            if (page.records.length > 0) {
+                closing.before((loadedRows > 0 ? ',\n' : '\n') + formatRecords(page.records));
+                loadedRows += page.records.length;
+            }
+            nextOffset = page.nextOffset;
+            updateStatus();
+        } catch (error) {
+            console.error('Error fetching records:', error);
+            status.textContent = `Error: ${error.message || 'Could not load more rows.'}`;
+            nextOffset = null;
+        } finally {
+            loading = false;
+        }
+    };
+
+    // The result box, not the <pre> itself, is the scrolling element.
+    // Assigned rather than added so a new result replaces the previous loader.
+    const scroller = pre.parentElement;
+    scroller.onscroll = () => {
+        if (scroller.scrollTop + scroller.clientHeight >= scroller.scrollHeight - 50) {
+            loadNextPage();
+        }
+    };
+    updateStatus();
+}
+
+// Fetches a window of the records of an uploaded file from /api/records
+function recordsPageFetcher(fileId, formData) {
+    return async (offset) => {
+        const params = new URLSearchParams({ file_id: fileId, offset: offset });
+        formData.getAll('column_names').forEach(name => params.append('column_names', name));
+        // Later windows must use the same row filters as the first one
+        ['filters', 'row_start', 'row_end'].forEach(field => {
+            const value = formData.get(field);
+            if (value) params.append(field, value);
+        });
+
+        const response = await fetch(`/api/records?${params.toString()}`);
+        const page = await response.json();
+        if (!response.ok) throw new Error(page.error || 'Could not load more rows.');
+        return { records: page.data, nextOffset: page.next_offset };
+    };
+}
+
+// Fetches a window of the records of an uploaded JSON file from /api/json-preview
+function jsonPreviewPageFetcher(fileId) {
+    return async (offset) => {
+        const response = await fetch('/api/json-preview', {
+            method: 'POST',
+            body: new URLSearchParams({ file_id: fileId, offset: offset })
+        });
+        const page = await response.json();
+        if (!response.ok) throw new Error(page.error || 'Could not load more rows.');
+        return { records: page.preview, nextOffset: page.next_offset };
+    };
+}
+
+async function handleJsonPreview(event, containerId) {
+    const file = event.target.files[0];
+    const previewContainer = document.getElementById(containerId);
+
+    if (!file || !previewContainer) return;
+
+    previewContainer.onscroll = null;
+    previewContainer.innerHTML = '<p class="placeholder-text">Loading preview...</p>';
+
+    const formData = new FormData();
+    formData.append('file', file);
+
+    try {
+        const response = await fetch('/api/json-preview', {
+            method: 'POST',
+            body: formData
+        });
+        const result = await response.json();
+
+        if (response.ok) {
+            previewContainer.innerHTML = '';
+            const pre = document.createElement('pre');
+            pre.className = 'result-display';
+            previewContainer.appendChild(pre);
+            attachPagedLoader(pre, { data: result.preview, total_rows: result.total_rows, next_offset: result.next_offset },
+                              jsonPreviewPageFetcher(result.file_id));
+        } else {
+            previewContainer.innerHTML = `<p class="placeholder-text error-text">Error: ${result.error || 'Could not read file.'}</p>`;
+        }
+    } catch (error) {
+        console.error('Error fetching preview:', error);
+        previewContainer.innerHTML = '<p class="placeholder-text error-text">An unexpected error occurred. Check console for details.</p>';
+    }
+}
+
 async function handleFileSelect(event, containerId, selectAllBtnId = null, inputType = 'radio') {
     const file = event.target.files[0];
     const columnsContainer = document.getElementById(containerId);
@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def flask_app(tmp_path, monkeypatch):
+    """The Flask app with its upload and generated files folders inside tmp_path."""
+    # app.py creates its folders relative to the working directory on import
+    monkeypatch.chdir(tmp_path)
+    import app as app_module
+
+    upload_folder = tmp_path / 'uploads'
+    generated_folder = tmp_path / 'generated_files'
+    upload_folder.mkdir(exist_ok=True)
+    generated_folder.mkdir(exist_ok=True)
+    monkeypatch.setitem(app_module.app.config, 'UPLOAD_FOLDER', str(upload_folder))
+    monkeypatch.setitem(app_module.app.config, 'GENERATED_FOLDER', str(generated_folder))
+    monkeypatch.setitem(app_module.app.config, 'TESTING', True)
+    return app_module.app
+
+@pytest.fixture
+def client(flask_app):
+    return flask_app.test_client()
@@ -0,0 +1,61 @@
+import gzip
+import os
+
+import pytest
+
+CONTENT = b'[\n    {"a": 1}\n]' * 100
+
+@pytest.fixture
+def generated_folder(flask_app):
+    folder = flask_app.config['GENERATED_FOLDER']
+    job_folder = f"{folder}/job"
+    os.makedirs(job_folder)
+    return job_folder
+
+def write_gzip(path, content=CONTENT):
+    with gzip.open(path, 'wb') as f:
+        f.write(content)
+
+def test_download_url_uses_the_uncompressed_name(flask_app, generated_folder):
+    from app import download_url_for
+    assert download_url_for(f"{generated_folder}/out.json.gz") == '/download/job/out.json'
+    assert download_url_for(f"{generated_folder}/out.json") == '/download/job/out.json'
+
+def test_download_sends_compressed_variant_to_clients_that_accept_it(client, generated_folder):
+    write_gzip(f"{generated_folder}/out.json.gz")
+    response = client.get('/download/job/out.json', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.mimetype == 'application/json'
+    assert 'out.json' in response.headers['Content-Disposition']
+    assert gzip.decompress(response.data) == CONTENT
+
+def test_download_decompresses_for_other_clients_and_supports_ranges(client, generated_folder):
+    write_gzip(f"{generated_folder}/out.json.gz")
+    response = client.get('/download/job/out.json')
+    assert response.status_code == 200
+    assert 'Content-Encoding' not in response.headers
+    assert response.data == CONTENT
+
+    response = client.get('/download/job/out.json', headers={'Range': 'bytes=2-9'})
+    assert response.status_code == 206
+    assert response.data == CONTENT[2:10]
+
+def test_download_compressed_file_by_its_own_name(client, generated_folder):
+    write_gzip(f"{generated_folder}/out.json.gz")
+    response = client.get('/download/job/out.json.gz', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.mimetype == 'application/gzip'
+    assert 'Content-Encoding' not in response.headers
+    assert gzip.decompress(response.data) == CONTENT
+
+def test_download_plain_file_supports_ranges(client, generated_folder):
+    with open(f"{generated_folder}/out.csv", 'wb') as f:
+        f.write(b'a,b\n1,2\n')
+    response = client.get('/download/job/out.csv', headers={'Range': 'bytes=0-2'})
+    assert response.status_code == 206
+    assert response.data == b'a,b'
+
+def test_download_missing_or_outside_files(client, generated_folder):
+    assert client.get('/download/job/missing.json').status_code == 404
+    assert client.get('/download/../app.py').status_code == 404
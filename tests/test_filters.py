@@ -0,0 +1,116 @@
+import pandas as pd
+import pytest
+
+from excel_processor import utils
+from excel_processor.filters import apply_filters, filter_columns, parse_filters, parse_row_range
+from excel_processor.utils import read_file_to_dataframe
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        'name': ['Ann', 'Bob', 'Cid', 'Dee', 'Eve'],
+        'age': [17, 18, 30, 31, None],
+        'city': ['Paris', 'Rome', 'Paris', 'Oslo', 'Rome'],
+        'code': ['9', '10', '100', 'n/a', None],
+    })
+
+def matching(df, filters):
+    return apply_filters(df, parse_filters(filters))['name'].tolist()
+
+def test_parse_filters_accepts_json_text_dicts_and_lists():
+    expected = [{'column': 'age', 'op': 'eq', 'value': 18}]
+    assert parse_filters('[{"column": "age", "value": 18}]') == expected
+    assert parse_filters({'column': 'age', 'value': 18}) == expected
+    assert parse_filters(None) == []
+    assert parse_filters('') == []
+
+@pytest.mark.parametrize('filters', [
+    '[{"column": "age"',
+    '"age"',
+    [{'op': 'eq', 'value': 1}],
+    [{'column': 'age', 'op': 'like', 'value': 1}],
+    [{'column': 'age', 'op': 'between', 'value': [1]}],
+    [{'column': 'age', 'op': 'in', 'value': 1}],
+    [{'column': 'age', 'op': 'eq', 'value': [1]}],
+    [{'column': 'age', 'op': 'gt'}],
+])
+def test_parse_filters_rejects_invalid_filters(filters):
+    with pytest.raises(ValueError):
+        parse_filters(filters)
+
+def test_parse_row_range():
+    assert parse_row_range(None, None) is None
+    assert parse_row_range('', '') is None
+    assert parse_row_range('5', None) == (5, None)
+    assert parse_row_range(None, '10') == (0, 10)
+    for bounds in [('a', None), ('-1', None), ('10', '5')]:
+        with pytest.raises(ValueError):
+            parse_row_range(*bounds)
+
+def test_filter_columns_keeps_order_without_duplicates():
+    filters = parse_filters([{'column': 'b', 'value': 1}, {'column': 'a', 'value': 1}, {'column': 'b', 'value': 2}])
+    assert filter_columns(filters) == ['b', 'a']
+
+@pytest.mark.parametrize('row_filter, expected', [
+    ({'column': 'age', 'op': 'eq', 'value': 18}, ['Bob']),
+    ({'column': 'age', 'op': 'ne', 'value': 18}, ['Ann', 'Cid', 'Dee', 'Eve']),
+    ({'column': 'age', 'op': 'gt', 'value': 18}, ['Cid', 'Dee']),
+    ({'column': 'age', 'op': 'ge', 'value': 18}, ['Bob', 'Cid', 'Dee']),
+    ({'column': 'age', 'op': 'lt', 'value': 18}, ['Ann']),
+    ({'column': 'age', 'op': 'le', 'value': 18}, ['Ann', 'Bob']),
+    ({'column': 'age', 'op': 'between', 'value': [18, 30]}, ['Bob', 'Cid']),
+    ({'column': 'city', 'op': 'in', 'value': ['Paris', 'Oslo']}, ['Ann', 'Cid', 'Dee']),
+    ({'column': 'age', 'op': 'notnull'}, ['Ann', 'Bob', 'Cid', 'Dee']),
+])
+def test_operators(df, row_filter, expected):
+    assert matching(df, [row_filter]) == expected
+
+def test_filters_are_combined(df):
+    filters = [{'column': 'city', 'value': 'Paris'}, {'column': 'age', 'op': 'gt', 'value': 20}]
+    assert matching(df, filters) == ['Cid']
+
+def test_numeric_text_values_compare_numerically(df):
+    # Compared as text, '9' > '10' and '100'
+    assert matching(df, [{'column': 'code', 'op': 'gt', 'value': '9'}]) == ['Bob', 'Cid']
+    assert matching(df, [{'column': 'code', 'op': 'le', 'value': 10}]) == ['Ann', 'Bob']
+    assert matching(df, [{'column': 'age', 'op': 'eq', 'value': '18'}]) == ['Bob']
+
+def test_text_values_compare_as_text(df):
+    assert matching(df, [{'column': 'code', 'op': 'eq', 'value': 'n/a'}]) == ['Dee']
+    assert matching(df, [{'column': 'city', 'op': 'ge', 'value': 'P'}]) == ['Ann', 'Bob', 'Cid', 'Eve']
+
+def test_whole_floats_compare_as_integers_in_text():
+    df = pd.DataFrame({'name': ['a', 'b'], 'value': [1.0, 2.5]})
+    assert matching(df, [{'column': 'value', 'op': 'in', 'value': ['1', 'x']}]) == ['a']
+    assert matching(df, [{'column': 'value', 'op': 'ne', 'value': 'x'}]) == ['a', 'b']
+
+def test_datetime_columns_compare_as_dates():
+    df = pd.DataFrame({'name': ['a', 'b'], 'day': pd.to_datetime(['2024-01-01', '2024-06-01'])})
+    assert matching(df, [{'column': 'day', 'op': 'gt', 'value': '2024-03-01'}]) == ['b']
+
+def test_missing_column_and_incompatible_filter(df):
+    with pytest.raises(ValueError, match="Column 'missing' not found"):
+        apply_filters(df, parse_filters([{'column': 'missing', 'value': 1}]))
+    dates = pd.DataFrame({'day': pd.to_datetime(['2024-01-01'])})
+    with pytest.raises(ValueError, match="Filter 'gt' on column 'day' needs a date value"):
+        apply_filters(dates, parse_filters([{'column': 'day', 'op': 'gt', 'value': 'Paris'}]))
+
+def test_csv_chunks_with_different_dtypes_are_filtered_alike(tmp_path, monkeypatch):
+    # The first chunk is all numbers and the second mixes in text, so pandas
+    # infers an int column for one chunk and an object column for the other
+    monkeypatch.setattr(utils, 'CSV_CHUNK_SIZE', 3)
+    path = tmp_path / 'data.csv'
+    path.write_text('id,code\n1,9\n2,10\n3,100\n4,9\n5,10\n6,x\n', encoding='utf-8')
+
+    for value in ['9', 9]:
+        filters = parse_filters([{'column': 'code', 'op': 'gt', 'value': value}])
+        assert read_file_to_dataframe(str(path), filters=filters)['id'].tolist() == [2, 3, 5]
+    filters = parse_filters([{'column': 'code', 'op': 'in', 'value': ['10', 'x']}])
+    assert read_file_to_dataframe(str(path), filters=filters)['id'].tolist() == [2, 5, 6]
+
+def test_row_range_with_filters(tmp_path):
+    path = tmp_path / 'data.csv'
+    pd.DataFrame({'id': range(10), 'even': [i % 2 == 0 for i in range(10)]}).to_csv(path, index=False)
+    filters = parse_filters([{'column': 'even', 'value': 'True'}])
+    df = read_file_to_dataframe(str(path), usecols=['id'], filters=filters, row_range=(3, 8))
+    assert df['id'].tolist() == [4, 6]
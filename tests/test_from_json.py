@@ -0,0 +1,88 @@
+import io
+import json
+import os
+
+import pytest
+
+from excel_processor import from_json
+from excel_processor.from_json import build_json_record_index, get_json_preview, has_json_record_index
+
+RECORDS = [{'id': i, 'name': f'名前 {i}', 'text': 'brackets ] } [ { and "quotes"', 'nested': {'values': [i, None]}}
+           for i in range(50)]
+
+def write_json(path, data, **kwargs):
+    path.write_text(json.dumps(data, ensure_ascii=False, **kwargs), encoding='utf-8')
+    return str(path)
+
+def record_offsets(path):
+    with open(path, 'rb') as f:
+        return list(from_json._iter_json_record_offsets(f))
+
+@pytest.mark.parametrize('indent', [None, 2])
+def test_record_offsets_point_at_each_record(tmp_path, monkeypatch, indent):
+    # A tiny read size makes records span several reads
+    monkeypatch.setattr(from_json, 'RECORD_INDEX_READ_SIZE', 16)
+    path = write_json(tmp_path / 'data.json', RECORDS, indent=indent)
+    data = open(path, 'rb').read()
+    offsets = record_offsets(path)
+    assert [json.loads(data[start:end]) for start, end in offsets] == RECORDS
+
+def test_record_offsets_skip_byte_order_mark(tmp_path):
+    path = tmp_path / 'data.json'
+    path.write_bytes(b'\xef\xbb\xbf [{"a": 1}, {"a": 2}]')
+    assert record_offsets(str(path)) == [(5, 13), (15, 23)]
+
+@pytest.mark.parametrize('content, message', [
+    ('{"a": 1}', 'list of objects'),
+    ('[1, 2]', 'list of objects'),
+    ('[{"a": 1} {"a": 2}]', 'list of objects'),
+    ('[{"a": 1}, {"a": ', 'Invalid JSON format'),
+    ('[{"a": 1}', 'Invalid JSON format'),
+])
+def test_record_offsets_reject_invalid_files(tmp_path, content, message):
+    path = tmp_path / 'data.json'
+    path.write_text(content, encoding='utf-8')
+    with pytest.raises(ValueError, match=message):
+        record_offsets(str(path))
+
+def test_record_index_is_stored_and_rebuilt_when_the_file_changes(tmp_path):
+    path = write_json(tmp_path / 'data.json', RECORDS)
+    assert not has_json_record_index(path)
+    assert build_json_record_index(path) == 50
+    assert has_json_record_index(path)
+
+    write_json(tmp_path / 'data.json', RECORDS[:3])
+    os.utime(path, ns=(0, 0))
+    assert not has_json_record_index(path)
+    assert build_json_record_index(path) == 3
+
+def test_get_json_preview_window(tmp_path):
+    path = write_json(tmp_path / 'data.json', RECORDS)
+    preview = get_json_preview(path, max_rows=5, offset=47)
+    assert preview['preview'] == RECORDS[47:]
+    assert preview['columns'] == ['id', 'name', 'text', 'nested']
+    assert preview['offset'] == 47
+    assert preview['total_rows'] == 50
+    assert preview['next_offset'] is None
+
+    assert get_json_preview(path, max_rows=5, offset=0)['next_offset'] == 5
+
+def test_get_json_preview_errors(tmp_path):
+    assert get_json_preview(write_json(tmp_path / 'empty.json', []))['error'] == 'JSON file is empty'
+    assert 'list of objects' in get_json_preview(write_json(tmp_path / 'object.json', {'a': 1}))['error']
+
+def test_json_preview_route_pages_by_file_id(client):
+    body = json.dumps(RECORDS).encode('utf-8')
+    response = client.post('/api/json-preview', data={'file': (io.BytesIO(body), 'data.json'), 'limit': 10})
+    assert response.status_code == 200
+    first = response.get_json()
+    assert first['preview'] == RECORDS[:10]
+    assert first['next_offset'] == 10
+
+    response = client.post('/api/json-preview', data={'file_id': first['file_id'], 'offset': 40, 'limit': 10})
+    assert response.get_json()['preview'] == RECORDS[40:]
+
+def test_json_preview_route_rejects_invalid_json(client):
+    response = client.post('/api/json-preview', data={'file': (io.BytesIO(b'{"a": 1}'), 'data.json')})
+    assert response.status_code == 400
+    assert 'list of objects' in response.get_json()['error']
@@ -0,0 +1,121 @@
+import json
+import os
+import time
+
+import pytest
+
+from excel_processor.jobs import (
+    AdmissionController,
+    AdmissionRejected,
+    WorkerLimitExceeded,
+    cleanup_expired_work_dirs,
+    create_work_dir,
+    estimate_memory_cost,
+    run_in_worker,
+)
+
+MB = 1024 * 1024
+
+# Worker functions are module level so the worker subprocess can import them
+
+def add(a, b=0):
+    return a + b
+
+def fail_with_value_error():
+    raise ValueError("bad input")
+
+def fail_with_key_error():
+    raise KeyError('missing')
+
+def sleep_for(seconds):
+    time.sleep(seconds)
+
+def allocate(megabytes):
+    data = bytearray(megabytes * MB)
+    time.sleep(5)
+    return len(data)
+
+def spin():
+    while True:
+        pass
+
+def test_create_work_dir_is_unique(tmp_path):
+    first_id, first_dir = create_work_dir(str(tmp_path))
+    second_id, second_dir = create_work_dir(str(tmp_path))
+    assert first_id != second_id
+    assert os.path.isdir(first_dir) and os.path.isdir(second_dir)
+
+def test_cleanup_expired_work_dirs(tmp_path):
+    _, old_dir = create_work_dir(str(tmp_path))
+    _, new_dir = create_work_dir(str(tmp_path))
+    os.utime(old_dir, (0, 0))
+    cleanup_expired_work_dirs(str(tmp_path), 3600)
+    assert not os.path.exists(old_dir)
+    assert os.path.isdir(new_dir)
+
+def test_estimate_memory_cost_depends_on_type_and_size(tmp_path):
+    csv_path = tmp_path / 'data.csv'
+    xlsx_path = tmp_path / 'data.xlsx'
+    csv_path.write_bytes(b'x' * MB)
+    xlsx_path.write_bytes(b'x' * MB)
+    assert estimate_memory_cost(str(xlsx_path)) > estimate_memory_cost(str(csv_path)) > MB
+
+def test_admission_within_budget_and_release(tmp_path):
+    admission = AdmissionController(str(tmp_path), 100, queue_timeout=0.2, poll_interval=0.05)
+    with admission.admit(60):
+        with pytest.raises(AdmissionRejected, match='busy'):
+            with admission.admit(60):
+                pass
+        with admission.admit(40):
+            pass
+    with admission.admit(100):
+        pass
+
+def test_admission_rejects_jobs_larger_than_the_budget(tmp_path):
+    admission = AdmissionController(str(tmp_path), 100)
+    with pytest.raises(AdmissionRejected, match='too large'):
+        with admission.admit(101):
+            pass
+
+def test_admission_waits_for_the_given_timeout(tmp_path):
+    admission = AdmissionController(str(tmp_path), 100, queue_timeout=30, poll_interval=0.05)
+    with admission.admit(100):
+        started = time.monotonic()
+        with pytest.raises(AdmissionRejected):
+            with admission.admit(1, timeout=0.2):
+                pass
+        assert time.monotonic() - started < 5
+
+def test_admission_ignores_reservations_of_dead_processes(tmp_path):
+    dead_pid = 2 ** 22 + 1
+    with open(tmp_path / 'stale.job', 'w') as f:
+        json.dump({'pid': dead_pid, 'cost': 100}, f)
+    admission = AdmissionController(str(tmp_path), 100, queue_timeout=0)
+    with admission.admit(100):
+        pass
+    assert not (tmp_path / 'stale.job').exists()
+
+def test_run_in_worker_returns_the_result():
+    assert run_in_worker(add, (1,), {'b': 2}) == 3
+
+def test_run_in_worker_reraises_errors():
+    with pytest.raises(ValueError, match='bad input'):
+        run_in_worker(fail_with_value_error)
+    with pytest.raises(RuntimeError, match='missing'):
+        run_in_worker(fail_with_key_error)
+
+def test_run_in_worker_timeout():
+    started = time.monotonic()
+    with pytest.raises(WorkerLimitExceeded, match='longer than allowed'):
+        run_in_worker(sleep_for, (30,), timeout=0.5)
+    assert time.monotonic() - started < 10
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/statm'), reason='needs /proc to read memory use')
+def test_run_in_worker_memory_limit():
+    with pytest.raises(WorkerLimitExceeded, match='more memory'):
+        run_in_worker(allocate, (256,), max_rss_bytes=128 * MB, timeout=30)
+
+@pytest.mark.skipif(os.name == 'nt', reason='RLIMIT_CPU is not available on Windows')
+def test_run_in_worker_cpu_limit():
+    with pytest.raises(WorkerLimitExceeded, match='CPU time'):
+        run_in_worker(spin, cpu_seconds=1, timeout=30)
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from loadtest import ENDPOINTS, _children, _is_multiprocessing_helper, parse_mix, percentile, summarize
+
+def test_parse_mix_weights():
+    assert parse_mix('list=3, json=1.5,clipboard') == {'list': 3.0, 'json': 1.5, 'clipboard': 1.0}
+
+@pytest.mark.parametrize('mix, message', [
+    ('list=1,upload=2', 'Unknown endpoint in mix: upload'),
+    ('list=0,json=0', 'positive weight'),
+])
+def test_parse_mix_rejects_bad_mixes(mix, message):
+    with pytest.raises(ValueError, match=message):
+        parse_mix(mix)
+
+def test_parse_mix_names_match_the_endpoints():
+    assert set(parse_mix(','.join(ENDPOINTS))) == set(ENDPOINTS)
+
+def test_percentile_uses_nearest_rank():
+    values = [5, 1, 4, 2, 3]
+    assert percentile(values, 50) == 3
+    assert percentile(values, 95) == 5
+    assert percentile(values, 20) == 1
+    assert percentile(values, 0) == 1
+    assert percentile(list(range(1, 101)), 99) == 99
+    assert percentile([], 50) is None
+
+def test_summarize_counts_errors_per_endpoint():
+    results = [
+        {'endpoint': 'list', 'rows': 10, 'status': 200, 'latency': 0.1},
+        {'endpoint': 'list', 'rows': 10, 'status': 302, 'latency': 0.2},
+        {'endpoint': 'list', 'rows': 10, 'status': 503, 'latency': 0.3},
+        {'endpoint': 'json', 'rows': 10, 'status': 'exception: URLError', 'latency': 0.4},
+    ]
+    summary = summarize(results, elapsed=2.0)
+
+    assert summary['requests'] == 4
+    assert summary['errors'] == 2
+    assert summary['error_rate'] == 0.5
+    assert summary['throughput_rps'] == 2.0
+    assert summary['statuses'] == {'200': 1, '302': 1, '503': 1, 'exception: URLError': 1}
+    assert summary['max_ms'] == 400.0
+    assert summary['endpoints']['list']['errors'] == 1
+    assert summary['endpoints']['list']['p50_ms'] == 200.0
+    assert summary['endpoints']['json']['error_rate'] == 1.0
+
+def test_summarize_without_results():
+    summary = summarize([], elapsed=0)
+    assert summary['requests'] == 0
+    assert summary['error_rate'] == 0.0
+    assert summary['p95_ms'] is None
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/cmdline'), reason='needs /proc')
+def test_fork_server_is_recognized_as_a_helper():
+    from excel_processor.jobs import run_in_worker
+    run_in_worker(len, ([1],))
+    helpers = [pid for pid in _children(os.getpid()) if _is_multiprocessing_helper(pid)]
+    assert helpers
+    assert not _is_multiprocessing_helper(os.getpid())
@@ -0,0 +1,89 @@
+import io
+import os
+
+import pandas as pd
+import pytest
+
+def test_get_headers_keeps_no_copy_of_the_upload(client, flask_app):
+    response = client.post('/api/get-headers', data={'file': (io.BytesIO(b'a,b\n1,2\n'), 'data.csv')})
+    assert response.status_code == 200
+    assert response.get_json()['headers'] == ['a', 'b']
+    assert os.listdir(flask_app.config['UPLOAD_FOLDER']) == []
+    assert os.listdir(flask_app.config['GENERATED_FOLDER']) == []
+
+def test_get_headers_invalid_file(client, flask_app):
+    response = client.post('/api/get-headers', data={'file': (io.BytesIO(b'\x00\x01'), 'data.xlsx')})
+    assert response.status_code == 500
+    assert os.listdir(flask_app.config['UPLOAD_FOLDER']) == []
+
+def test_clipboard_display(client):
+    response = client.post('/convert/clipboard', data={'data': 'a\nb\n', 'action': 'to_list'})
+    assert response.status_code == 200
+    assert response.get_json() == {'data': '[a, b]', 'is_json_string': True}
+
+    response = client.post('/convert/clipboard', data={'data': 'a, b = [1, 2]', 'action': 'extract_lists',
+                                                       'extract_output_method': 'display'})
+    assert response.status_code == 200
+
+def test_clipboard_file_output(client, flask_app):
+    response = client.post('/convert/clipboard', data={'data': '[{"a": 1}, {"a": 2}]', 'action': 'from_json',
+                                                       'json_output_method': 'file', 'json_file_format': 'csv'})
+    assert response.status_code == 200
+    download = client.get(response.get_json()['download_url'])
+    assert download.data.decode('utf-8').splitlines() == ['a', '1', '2']
+
+def test_clipboard_errors(client):
+    assert client.post('/convert/clipboard', data={'data': 'x', 'action': 'nope'}).status_code == 400
+    response = client.post('/convert/clipboard', data={'data': 'not json', 'action': 'from_json'})
+    assert response.status_code == 500
+    assert 'Invalid JSON format' in response.get_json()['error']
+
+def test_clipboard_is_rejected_when_over_the_memory_budget(client, monkeypatch):
+    import app as app_module
+    monkeypatch.setattr(app_module.admission, 'budget_bytes', 1)
+    response = client.post('/convert/clipboard', data={'data': 'a\nb\n', 'action': 'to_list'})
+    assert response.status_code == 503
+    assert 'too large' in response.get_json()['error']
+
+@pytest.fixture
+def xlsx_upload(tmp_path):
+    path = tmp_path / 'data.xlsx'
+    pd.DataFrame({'name': ['a', 'b'], 'day': pd.to_datetime(['2024-01-01', '2024-06-01'])}).to_excel(path, index=False)
+    return path.read_bytes()
+
+@pytest.mark.parametrize('output_method', ['file', 'display', 'add_to_table'])
+def test_convert_json_reports_filter_errors(client, xlsx_upload, output_method):
+    bad_filters = {
+        '[{"column": "day", "op": "gt", "value": "Paris"}]': "Filter 'gt' on column 'day' needs a date value",
+        '[{"column": "missing", "value": 1}]': "Column 'missing' not found in the file.",
+    }
+    for filters, message in bad_filters.items():
+        response = client.post('/convert/json', data={
+            'file': (io.BytesIO(xlsx_upload), 'data.xlsx'),
+            'column_names': ['name'],
+            'output_method': output_method,
+            'filters': filters,
+        })
+        assert response.status_code == 400
+        assert response.get_json()['error'] == message
+
+def test_convert_json_with_date_filter(client, xlsx_upload):
+    response = client.post('/convert/json', data={
+        'file': (io.BytesIO(xlsx_upload), 'data.xlsx'),
+        'column_names': ['name'],
+        'output_method': 'display',
+        'filters': '[{"column": "day", "op": "gt", "value": "2024-03-01"}]',
+    })
+    assert response.status_code == 200
+    assert response.get_json()['data'] == [{'name': 'b'}]
+
+@pytest.mark.parametrize('output_method', ['file', 'display'])
+def test_convert_list_reports_filter_errors(client, xlsx_upload, output_method):
+    response = client.post('/convert/list', data={
+        'file': (io.BytesIO(xlsx_upload), 'data.xlsx'),
+        'column_name': 'name',
+        'output_method': output_method,
+        'filters': '[{"column": "day", "op": "le", "value": "Paris"}]',
+    })
+    assert response.status_code == 400
+    assert response.get_json()['error'] == "Filter 'le' on column 'day' needs a date value"
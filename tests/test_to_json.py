@@ -0,0 +1,52 @@
+import json
+
+import pandas as pd
+import pytest
+
+from excel_processor.to_json import build_records_cache, get_json_records_page, has_records_cache
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'data.csv'
+    pd.DataFrame({
+        'id': range(100),
+        'payload': [json.dumps({'n': i}) for i in range(100)],
+        'city': ['Paris', 'Rome'] * 50,
+    }).to_csv(path, index=False)
+    return str(path)
+
+def test_records_page_window(csv_path):
+    page = get_json_records_page(csv_path, ['id', 'payload'], offset=98, limit=5)
+    assert page['records'] == [{'id': 98, 'payload': {'n': 98}}, {'id': 99, 'payload': {'n': 99}}]
+    assert page['offset'] == 98
+    assert page['total_rows'] == 100
+    assert page['next_offset'] is None
+
+    assert get_json_records_page(csv_path, ['id'], offset=0, limit=10)['next_offset'] == 10
+    assert get_json_records_page(csv_path, ['id'], offset=500, limit=10)['records'] == []
+
+def test_records_cache_is_built_once_per_selection(csv_path):
+    filters = [{'column': 'city', 'op': 'eq', 'value': 'Rome'}]
+    assert not has_records_cache(csv_path, ['id'], filters)
+    assert build_records_cache(csv_path, ['id'], filters) == 50
+    assert has_records_cache(csv_path, ['id'], filters)
+    assert not has_records_cache(csv_path, ['id'])
+
+    page = get_json_records_page(csv_path, ['id'], offset=0, limit=3, filters=filters)
+    assert page['records'] == [{'id': 1}, {'id': 3}, {'id': 5}]
+    assert page['total_rows'] == 50
+
+def test_records_page_with_row_range(csv_path):
+    page = get_json_records_page(csv_path, ['id'], offset=0, limit=100, row_range=(10, 13))
+    assert page['records'] == [{'id': 10}, {'id': 11}, {'id': 12}]
+
+def test_records_page_missing_column(csv_path):
+    with pytest.raises(ValueError, match="Column 'missing' not found"):
+        get_json_records_page(csv_path, ['missing'])
+
+def test_records_page_keeps_unicode_line_separators_inside_values(tmp_path):
+    path = tmp_path / 'data.csv'
+    values = ['a\u2028b', 'p\x85q', 'x\u2029y']
+    pd.DataFrame({'text': values}).to_csv(path, index=False, encoding='utf-8')
+    page = get_json_records_page(str(path), ['text'], offset=0, limit=10)
+    assert page['records'] == [{'text': value} for value in values]
@@ -0,0 +1,77 @@
+import gzip
+import json
+
+import pandas as pd
+import pytest
+
+from excel_processor.writers import (
+    build_output_path,
+    normalize_compression,
+    write_dataframe,
+    write_json_records,
+)
+
+def read_text(path, compression=None):
+    if compression == 'gzip':
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return f.read()
+    if compression == 'zstd':
+        zstandard = pytest.importorskip('zstandard')
+        with open(path, 'rb') as f:
+            return zstandard.ZstdDecompressor().stream_reader(f).read().decode('utf-8')
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def test_normalize_compression():
+    assert normalize_compression(None) is None
+    assert normalize_compression('none') is None
+    assert normalize_compression('gzip') == 'gzip'
+    with pytest.raises(ValueError):
+        normalize_compression('brotli')
+
+def test_build_output_path_adds_suffix_to_text_formats_only(tmp_path):
+    assert build_output_path(str(tmp_path), 'out', 'json', 'gzip').endswith('out.json.gz')
+    assert build_output_path(str(tmp_path), 'out', 'csv', 'zstd').endswith('out.csv.zst')
+    assert build_output_path(str(tmp_path), 'out', 'parquet', 'zstd').endswith('out.parquet')
+
+def test_write_json_records_without_records_is_an_empty_array(tmp_path):
+    output_path = tmp_path / 'empty.json'
+    write_json_records(iter([]), str(output_path))
+    assert json.loads(output_path.read_text(encoding='utf-8')) == []
+
+@pytest.mark.parametrize('compression', [None, 'gzip', 'zstd'])
+def test_write_json_records_round_trips(tmp_path, compression):
+    records = [{'name': 'é', 'nested': {'a': [1, 2]}}, {'name': None, 'nested': None}]
+    output_path = build_output_path(str(tmp_path), 'out', 'json', compression)
+    write_json_records(records, output_path, 'json', compression)
+    assert json.loads(read_text(output_path, compression)) == records
+
+def test_write_json_records_ndjson(tmp_path):
+    output_path = tmp_path / 'out.ndjson'
+    write_json_records([{'a': 1}, {'a': 2}], str(output_path), 'ndjson')
+    lines = output_path.read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line) for line in lines] == [{'a': 1}, {'a': 2}]
+
+def test_write_dataframe_ndjson_writes_missing_values_as_null(tmp_path):
+    df = pd.DataFrame({'a': [1.5, None], 'b': ['x', None]})
+    output_path = tmp_path / 'out.ndjson'
+    write_dataframe(df, str(output_path), 'ndjson')
+    lines = output_path.read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line) for line in lines] == [{'a': 1.5, 'b': 'x'}, {'a': None, 'b': None}]
+
+def test_write_dataframe_parquet_with_mixed_object_column(tmp_path):
+    pytest.importorskip('pyarrow')
+    df = pd.DataFrame({'mixed': [1, 'x', None], 'nested': [{'k': 1}, [1, 2], None], 'text': ['a', None, 'c']})
+    output_path = tmp_path / 'out.parquet'
+    write_dataframe(df, str(output_path), 'parquet')
+
+    result = pd.read_parquet(output_path)
+    assert result['mixed'].tolist()[:2] == ['1', 'x']
+    assert result['nested'].tolist()[:2] == ['{"k": 1}', '[1, 2]']
+    assert result['text'].tolist()[0] == 'a'
+    # The input DataFrame is left unchanged
+    assert df['mixed'].tolist()[0] == 1
+
+def test_write_dataframe_rejects_compressed_excel(tmp_path):
+    with pytest.raises(ValueError):
+        write_dataframe(pd.DataFrame({'a': [1]}), str(tmp_path / 'out.xlsx'), 'xlsx', 'gzip')